@@ -0,0 +1,77 @@
+"""
+Funções de acesso à API de leilões independentes de ambiente.
+
+Os scripts principais montam as requisições com a URL do seu próprio arquivo
+de configuração; as funções deste módulo recebem a URL e o domínio do
+leiloeiro como parâmetro, permitindo consultar produção e homologação no mesmo
+processo (por exemplo, para comparar os dois ambientes).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import transporte
+
+URL_LEILOEIRO_PROD = "www.giordanoleiloes.com.br"
+URL_LEILOEIRO_TESTE = "teste.giordanoleiloes.com.br"
+
+
+def buscar_lotes(url: str, leilao_id: str, nm_vendidos: str,
+                 headers: Optional[Dict] = None,
+                 url_leiloeiro: Optional[str] = None) -> List[Dict]:
+    """
+    Busca os lotes de um leilão com o status de venda informado.
+
+    Args:
+        url (str): URL do endpoint buscar-lotes
+        leilao_id (str): ID do leilão
+        nm_vendidos (str): "S" para vendidos, "N" para não vendidos
+        headers (Dict): Cabeçalhos da requisição
+        url_leiloeiro (str): Domínio do leiloeiro, quando exigido pelo ambiente
+
+    Raises:
+        httpx.HTTPError: Em caso de falha de conexão ou status diferente de 2xx
+        ValueError: Se a resposta não for uma lista de lotes
+    """
+    form_data = {
+        "leilao_id": str(leilao_id),
+        "nm_vendidos": nm_vendidos
+    }
+    if url_leiloeiro:
+        form_data["url_leiloeiro"] = url_leiloeiro
+
+    response = transporte.post(url, data=form_data, headers=headers)
+    response.raise_for_status()
+
+    lotes = response.json()
+    if not isinstance(lotes, list):
+        raise ValueError(f"Resposta inesperada para nm_vendidos={nm_vendidos}: {type(lotes).__name__}")
+    return lotes
+
+
+def buscar_todos_lotes(url: str, leilao_id: str,
+                       headers: Optional[Dict] = None,
+                       url_leiloeiro: Optional[str] = None) -> List[Dict]:
+    """
+    Busca lotes vendidos e não vendidos de um leilão em paralelo.
+
+    Retorna os vendidos seguidos dos não vendidos, na mesma ordem usada pelos
+    scripts de relatório.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futuros = [
+            executor.submit(buscar_lotes, url, leilao_id, nm_vendidos, headers, url_leiloeiro)
+            for nm_vendidos in ("S", "N")
+        ]
+        return [lote for futuro in futuros for lote in futuro.result()]
+
+
+def valor_arrematado(lote: Dict) -> float:
+    """Retorna o valor arrematado de um lote, ou 0 se não houver arrematação"""
+    arrematacao = lote.get("arrematacao")
+    if isinstance(arrematacao, dict):
+        try:
+            return float(arrematacao.get("vl") or 0)
+        except (TypeError, ValueError):
+            return 0.0
+    return 0.0
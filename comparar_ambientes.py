@@ -0,0 +1,205 @@
+"""
+Compara os lotes de um ou mais leilões entre produção e homologação.
+
+Para cada leilão os lotes são buscados em paralelo nos dois ambientes
+(``url_prod`` de config.py e ``url_test`` de config2.py), indexados pela chave
+do lote (``lote_id`` por padrão, ou ``nu_lote``) e comparados em tempo linear.
+O relatório lista os lotes adicionados, removidos e alterados em homologação,
+as chaves repetidas em cada ambiente e a diferença nos totais do leilão.
+
+Exemplo de uso:
+    python comparar_ambientes.py 15324
+    python comparar_ambientes.py 15324 15325 15326 --chave nu_lote --json diferencas.json
+
+O script termina com código 1 se algum leilão apresentar diferenças.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import api_leiloes
+import perfil_cpu
+import transporte
+from config import API_CONFIG as API_PROD
+from config2 import API_CONFIG as API_TESTE
+from diferencas import comparar_indices, indexar_lotes
+
+logging.basicConfig(level=logging.WARNING)
+
+# Campos que diferem entre os ambientes por definição
+CAMPOS_IGNORADOS = {"url_leiloeiro"}
+
+
+def resumir_lotes(lotes: List[Dict]) -> Dict:
+    """Calcula os totais do leilão usados no quadro resumo"""
+    vendidos = [lote for lote in lotes if str(lote.get("nm_status", "")).strip().upper() == "VENDIDO"]
+    return {
+        "total_lotes": len(lotes),
+        "lotes_vendidos": len(vendidos),
+        "lotes_nao_vendidos": len(lotes) - len(vendidos),
+        "valor_total_arrematado": round(sum(api_leiloes.valor_arrematado(lote) for lote in vendidos), 2),
+    }
+
+
+def comparar_lotes(lotes_prod: List[Dict], lotes_teste: List[Dict],
+                   chave: str = "lote_id") -> Dict:
+    """
+    Compara duas listas de lotes do mesmo leilão.
+
+    Returns:
+        Dict com as chaves:
+        - adicionados: chaves presentes apenas em homologação
+        - removidos: chaves presentes apenas em produção
+        - alterados: {chave: {campo: [valor_prod, valor_teste]}}
+        - duplicados: {"producao": {chave: ocorrências}, "homologacao": {...}},
+          chaves repetidas em cada ambiente (só a primeira ocorrência é comparada)
+        - resumo: totais de cada ambiente e a diferença (teste - produção)
+    """
+    duplicados_prod, duplicados_teste = {}, {}
+    adicionados, removidos, alterados = comparar_indices(
+        indexar_lotes(lotes_prod, chave, duplicados_prod),
+        indexar_lotes(lotes_teste, chave, duplicados_teste),
+        CAMPOS_IGNORADOS
+    )
+
+    resumo_prod = resumir_lotes(lotes_prod)
+    resumo_teste = resumir_lotes(lotes_teste)
+
+    return {
+        "adicionados": adicionados,
+        "removidos": removidos,
+        "alterados": alterados,
+        "duplicados": {
+            "producao": duplicados_prod,
+            "homologacao": duplicados_teste,
+        },
+        "resumo": {
+            "producao": resumo_prod,
+            "homologacao": resumo_teste,
+            "diferenca": {
+                campo: round(resumo_teste[campo] - resumo_prod[campo], 2)
+                for campo in resumo_prod
+            },
+        },
+    }
+
+
+def comparar_leilao(leilao_id: str, chave: str) -> Dict:
+    """Busca o leilão nos dois ambientes em paralelo e compara os lotes"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futuro_prod = executor.submit(
+            api_leiloes.buscar_todos_lotes, API_PROD["url_prod"], leilao_id,
+            API_PROD["headers"], api_leiloes.URL_LEILOEIRO_PROD
+        )
+        futuro_teste = executor.submit(
+            api_leiloes.buscar_todos_lotes, API_TESTE["url_test"], leilao_id,
+            API_TESTE["headers"], api_leiloes.URL_LEILOEIRO_TESTE
+        )
+        lotes_prod = futuro_prod.result()
+        lotes_teste = futuro_teste.result()
+
+    resultado = comparar_lotes(lotes_prod, lotes_teste, chave)
+    resultado["leilao_id"] = leilao_id
+    return resultado
+
+
+def possui_diferencas(resultado: Dict) -> bool:
+    """Indica se a comparação encontrou alguma diferença ou erro"""
+    return bool(
+        resultado.get("erro")
+        or resultado["adicionados"]
+        or resultado["removidos"]
+        or resultado["alterados"]
+        or any(resultado["duplicados"].values())
+    )
+
+
+def imprimir_resultado(resultado: Dict) -> None:
+    """Imprime o relatório de diferenças de um leilão"""
+    print("=" * 50)
+    print(f"Leilão {resultado['leilao_id']}")
+    print("=" * 50)
+
+    if resultado.get("erro"):
+        print(f"Erro ao comparar: {resultado['erro']}")
+        return
+
+    if not possui_diferencas(resultado):
+        print("Nenhuma diferença encontrada.")
+
+    for k in resultado["adicionados"]:
+        print(f"+ Lote {k}: presente apenas em homologação")
+    for k in resultado["removidos"]:
+        print(f"- Lote {k}: presente apenas em produção")
+    for ambiente, nome in (("producao", "produção"), ("homologacao", "homologação")):
+        for k, ocorrencias in resultado["duplicados"][ambiente].items():
+            print(f"! Lote {k}: {ocorrencias} ocorrências em {nome}")
+    for k, diferencas in resultado["alterados"].items():
+        print(f"~ Lote {k}:")
+        for campo, (valor_prod, valor_teste) in sorted(diferencas.items()):
+            print(f"    {campo}: {valor_prod!r} -> {valor_teste!r}")
+
+    print("\nResumo (produção / homologação / diferença):")
+    resumo = resultado["resumo"]
+    for campo in resumo["producao"]:
+        print(f"- {campo}: {resumo['producao'][campo]} / "
+              f"{resumo['homologacao'][campo]} / {resumo['diferenca'][campo]:+}")
+
+
+def main(leilao_ids: List[str], chave: str, paralelos: int,
+         arquivo_json: Optional[str] = None) -> int:
+    """
+    Compara todos os leilões informados e retorna o código de saída do script.
+    """
+    # Cada leilão abre até quatro requisições simultâneas (S/N em cada ambiente)
+    transporte.configurar_transporte(verify=False, max_connections=max(10, paralelos * 4))
+
+    def comparar(leilao_id: str) -> Dict:
+        try:
+            return comparar_leilao(leilao_id, chave)
+        except Exception as e:
+            logging.error(f"Erro ao comparar o leilão {leilao_id}: {e}")
+            return {"leilao_id": leilao_id, "erro": str(e)}
+
+    with ThreadPoolExecutor(max_workers=paralelos) as executor:
+        resultados = list(executor.map(comparar, leilao_ids))
+
+    for resultado in resultados:
+        imprimir_resultado(resultado)
+
+    com_diferenca = [r["leilao_id"] for r in resultados if possui_diferencas(r)]
+    print("\n" + "=" * 50)
+    print(f"Leilões comparados: {len(resultados)}")
+    print(f"Leilões com diferenças ou erros: {len(com_diferenca)}")
+    if com_diferenca:
+        print(f"IDs: {', '.join(com_diferenca)}")
+
+    if arquivo_json:
+        with open(arquivo_json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"Resultado salvo em {arquivo_json}")
+
+    return 1 if com_diferenca else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara lotes de leilões entre produção e homologação")
+    parser.add_argument("leilao_ids", nargs="+", help="IDs dos leilões a comparar")
+    parser.add_argument("--chave", choices=["lote_id", "nu_lote"], default="lote_id",
+                        help="Campo usado para relacionar os lotes dos dois ambientes")
+    parser.add_argument("--paralelos", type=int, default=4,
+                        help="Quantidade de leilões comparados simultaneamente")
+    parser.add_argument("--json", dest="arquivo_json", help="Salva o resultado completo em JSON")
+    perfil_cpu.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    if args.paralelos <= 0:
+        parser.error("--paralelos deve ser maior que zero")
+
+    with perfil_cpu.perfilar(args, globals()):
+        codigo = main(args.leilao_ids, args.chave, args.paralelos, args.arquivo_json)
+    sys.exit(codigo)
@@ -0,0 +1,164 @@
+"""
+Consolidado com vários leilões, atualizado apenas por acréscimo.
+
+O consolidado é uma pasta com:
+- ``leilao_<id>.xlsx``: os lotes de cada leilão, no mesmo formato do relatório
+  individual, gravados linha a linha (openpyxl em modo write-only)
+- ``leiloes.jsonl``: uma linha por leilão acrescentado, com os totais do
+  quadro resumo; o arquivo só recebe linhas novas
+- ``RESUMO GERAL.xlsx``: uma linha por leilão e o TOTAL, refeito a cada
+  acréscimo a partir do ``leiloes.jsonl``
+
+Acrescentar um leilão grava apenas a planilha dele, uma linha no
+``leiloes.jsonl`` e o resumo geral (uma linha por leilão); as planilhas dos
+leilões anteriores não são lidas nem regravadas. Executar novamente para um
+leilão já presente substitui a planilha dele e acrescenta uma nova linha de
+totais, que prevalece sobre as anteriores no resumo geral.
+
+Exemplo de uso:
+    consolidado.adicionar_leilao("leiloes_2025T1", "15324", nm_leilao, lotes, quadro)
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from resumo import QuadroResumo
+
+NOME_RESUMO = "RESUMO GERAL"
+ARQUIVO_RESUMO = f"{NOME_RESUMO}.xlsx"
+ARQUIVO_LEILOES = "leiloes.jsonl"
+
+FORMATO_MOEDA = "#,##0.00"
+
+COLUNAS_RESUMO = [
+    "Leilão", "Nome do leilão", "Total de lotes", "Lotes arrematados", "% arrematados",
+    "Lotes não arrematados", "% não arrematados", "Valor total arrematado", "Atualizado em",
+]
+
+
+def arquivo_leilao(diretorio: str, leilao_id: str) -> str:
+    """Caminho da planilha de um leilão no consolidado"""
+    nome = re.sub(r"[^\w.-]", "_", str(leilao_id))
+    return os.path.join(diretorio, f"leilao_{nome}.xlsx")
+
+
+def ler_leiloes(diretorio: str) -> List[Dict]:
+    """
+    Lê os totais registrados no consolidado, um por leilão, na ordem em que
+    cada leilão foi acrescentado pela primeira vez. Para leilões acrescentados
+    mais de uma vez vale a última linha.
+    """
+    leiloes: Dict[str, Dict] = {}
+    caminho = os.path.join(diretorio, ARQUIVO_LEILOES)
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding="utf-8") as f:
+        for numero, linha in enumerate(f, start=1):
+            if not linha.strip():
+                continue
+            try:
+                leilao = json.loads(linha)
+            except ValueError:
+                # Linha incompleta de uma execução interrompida
+                logging.warning(f"{caminho}: linha {numero} inválida ignorada")
+                continue
+            leiloes[leilao["leilao_id"]] = leilao
+    return list(leiloes.values())
+
+
+def _gravar_planilha(arquivo: str, titulo: str, linhas: Iterable[List],
+                     formatos_colunas: Optional[Dict[int, str]] = None) -> None:
+    """
+    Grava uma planilha de uma aba linha a linha; a primeira linha é o
+    cabeçalho, em negrito. O arquivo só é substituído depois de gravado.
+    """
+    formatos_colunas = formatos_colunas or {}
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(titulo[:31])
+    negrito = Font(bold=True)
+
+    for numero, linha in enumerate(linhas):
+        celulas = []
+        for indice, valor in enumerate(linha):
+            celula = WriteOnlyCell(ws, value=valor)
+            if numero == 0:
+                celula.font = negrito
+            elif indice in formatos_colunas:
+                celula.number_format = formatos_colunas[indice]
+            celulas.append(celula)
+        ws.append(celulas)
+
+    temporario = f"{arquivo}.tmp"
+    wb.save(temporario)
+    os.replace(temporario, arquivo)
+
+
+def _linhas_lotes(lotes: Iterable[Dict]) -> Iterator[List]:
+    """Linhas da planilha do leilão: cabeçalho com as colunas do primeiro lote e os lotes"""
+    for i, lote in enumerate(lotes):
+        if i == 0:
+            yield list(lote.keys())
+        yield list(lote.values())
+
+
+def _linhas_resumo(leiloes: List[Dict]) -> Iterator[List]:
+    """Linhas do resumo geral: uma por leilão e o TOTAL"""
+    yield COLUNAS_RESUMO
+    total = QuadroResumo()
+    for leilao in leiloes:
+        r = leilao["resumo"]
+        yield [
+            leilao["leilao_id"], leilao["nm_leilao"], r["total_lotes"], r["total_arrematados"],
+            r["perc_arrematados"], r["total_nao_arrematados"], r["perc_nao_arrematados"],
+            r["valor_total_arrematado"], leilao["atualizado_em"],
+        ]
+        total.total_arrematados += r["total_arrematados"]
+        total.total_nao_arrematados += r["total_nao_arrematados"]
+        total.valor_total_arrematado += r["valor_total_arrematado"]
+
+    t = total.como_dict()
+    yield [
+        "TOTAL", f"{len(leiloes)} leilões", t["total_lotes"], t["total_arrematados"],
+        t["perc_arrematados"], t["total_nao_arrematados"], t["perc_nao_arrematados"],
+        t["valor_total_arrematado"], None,
+    ]
+
+
+def adicionar_leilao(diretorio: str, leilao_id: str, nm_leilao: str,
+                     lotes: Iterable[Dict], quadro: QuadroResumo) -> None:
+    """
+    Acrescenta (ou substitui) um leilão no consolidado.
+
+    Args:
+        diretorio (str): Pasta do consolidado; é criada se não existir
+        leilao_id (str): ID do leilão
+        nm_leilao (str): Nome do leilão, exibido no resumo geral
+        lotes (Iterable[Dict]): Lotes já formatados (como em processar_lotes);
+            pode ser um gerador, percorrido uma única vez
+        quadro (QuadroResumo): Totais do leilão; lido somente depois de
+            percorrer os lotes, podendo ser preenchido durante a iteração
+    """
+    leilao_id = str(leilao_id)
+    os.makedirs(diretorio, exist_ok=True)
+
+    _gravar_planilha(arquivo_leilao(diretorio, leilao_id), f"Leilão {leilao_id}", _linhas_lotes(lotes))
+
+    leilao = {
+        "leilao_id": leilao_id,
+        "nm_leilao": nm_leilao,
+        "resumo": quadro.como_dict(),
+        "atualizado_em": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+    }
+    with open(os.path.join(diretorio, ARQUIVO_LEILOES), "a", encoding="utf-8") as f:
+        f.write(json.dumps(leilao, ensure_ascii=False) + "\n")
+
+    _gravar_planilha(os.path.join(diretorio, ARQUIVO_RESUMO), NOME_RESUMO,
+                     _linhas_resumo(ler_leiloes(diretorio)), {7: FORMATO_MOEDA})
@@ -0,0 +1,131 @@
+"""
+Consulta rápida de lotes de um leilão sem gerar relatório.
+
+Na primeira consulta os lotes são buscados na API e gravados em cache
+(``.cache_leiloes/``), já em ordem natural de ``nu_lote``; as consultas
+seguintes leem o cache e respondem em milissegundos. Use ``--atualizar`` para
+buscar novamente.
+
+Exemplo de uso:
+    python consultar_lotes.py 15324 --lote 12A
+    python consultar_lotes.py 15324 --top 10
+    python consultar_lotes.py 15324 --bottom 5 --criterio evolucao
+    python consultar_lotes.py 15324 --lote 0001/2025 --ambiente teste
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Dict, List
+
+import api_leiloes
+import indice_lotes
+import perfil_cpu
+
+DIRETORIO_CACHE = ".cache_leiloes"
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def arquivo_cache(leilao_id: str, ambiente: str) -> str:
+    return os.path.join(DIRETORIO_CACHE, f"leilao_{leilao_id}_{ambiente}.json")
+
+
+def carregar_lotes(leilao_id: str, ambiente: str = "prod", atualizar: bool = False) -> List[Dict]:
+    """
+    Retorna os lotes do leilão em ordem natural, lendo do cache quando
+    disponível e buscando na API caso contrário.
+    """
+    caminho = arquivo_cache(leilao_id, ambiente)
+    if not atualizar and os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+
+    import transporte
+    transporte.configurar_transporte(verify=False)
+    if ambiente == "prod":
+        from config import API_CONFIG
+        lotes = api_leiloes.buscar_todos_lotes(
+            API_CONFIG["url_prod"], leilao_id, API_CONFIG["headers"], api_leiloes.URL_LEILOEIRO_PROD
+        )
+    else:
+        from config2 import API_CONFIG
+        lotes = api_leiloes.buscar_todos_lotes(
+            API_CONFIG["url_test"], leilao_id, API_CONFIG["headers"], api_leiloes.URL_LEILOEIRO_TESTE
+        )
+
+    indice_lotes.ordenar_lotes(lotes)
+    os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(lotes, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+    return lotes
+
+
+def formatar_lote(lote: Dict) -> str:
+    """Formata os principais dados de um lote em uma linha"""
+    valor = api_leiloes.valor_arrematado(lote)
+    evolucao = indice_lotes.percentual_evolucao(lote)
+    return (
+        f"Lote {lote.get('nu_lote', 'N/A')} | OSA {lote.get('nm_osa', 'N/A')} | "
+        f"{lote.get('nm_status', 'N/A')} | "
+        f"Avaliação R$ {float(lote.get('vl_avaliacao') or 0):,.2f} | "
+        f"Mínimo R$ {float(lote.get('vl_minimo') or 0):,.2f} | "
+        f"Arrematado R$ {valor:,.2f}"
+        + (f" | Evolução {evolucao:.2f}%" if evolucao is not None else "")
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta lotes de um leilão a partir de cache local")
+    parser.add_argument("leilao_id", help="ID do leilão")
+    parser.add_argument("--lote", action="append", metavar="CHAVE",
+                        help="Número do lote, lote_id ou OSA (pode repetir)")
+    parser.add_argument("--top", type=int, metavar="N", help="N lotes com maior valor/evolução")
+    parser.add_argument("--bottom", type=int, metavar="N", help="N lotes com menor valor/evolução")
+    parser.add_argument("--criterio", choices=indice_lotes.CRITERIOS, default="valor",
+                        help="Critério de --top/--bottom (padrão: valor arrematado)")
+    parser.add_argument("--ambiente", choices=["prod", "teste"], default="prod")
+    parser.add_argument("--atualizar", action="store_true", help="Ignora o cache e busca na API")
+    parser.add_argument("--json", action="store_true", help="Emite os lotes encontrados em JSON")
+    perfil_cpu.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    if not (args.lote or args.top or args.bottom or args.atualizar):
+        parser.error("informe --lote, --top, --bottom ou --atualizar")
+
+    with perfil_cpu.perfilar(args, globals()):
+        try:
+            indice = indice_lotes.IndiceLotes(carregar_lotes(args.leilao_id, args.ambiente, args.atualizar))
+        except Exception as e:
+            logging.error(f"Erro ao carregar os lotes do leilão {args.leilao_id}: {e}")
+            sys.exit(2)
+
+        resultado = {}
+        if args.lote:
+            resultado["lotes"] = {chave: indice.buscar(chave) for chave in args.lote}
+        if args.top:
+            resultado["top"] = [lote for _, lote in indice.maiores(args.top, args.criterio)]
+        if args.bottom:
+            resultado["bottom"] = [lote for _, lote in indice.menores(args.bottom, args.criterio)]
+
+        if args.json:
+            print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        else:
+            print(f"Leilão {args.leilao_id}: {len(indice)} lotes")
+            for chave, lote in resultado.get("lotes", {}).items():
+                print(formatar_lote(lote) if lote else f"Lote {chave}: não encontrado")
+            if "top" in resultado:
+                print(f"\nMaiores por {args.criterio}:")
+                for lote in resultado["top"]:
+                    print(f"- {formatar_lote(lote)}")
+            if "bottom" in resultado:
+                print(f"\nMenores por {args.criterio}:")
+                for lote in resultado["bottom"]:
+                    print(f"- {formatar_lote(lote)}")
+
+        if args.lote and not all(resultado["lotes"].values()):
+            sys.exit(1)
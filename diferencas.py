@@ -0,0 +1,63 @@
+"""
+Comparação de conjuntos de lotes indexados por chave.
+
+Usado para comparar produção e homologação (comparar_ambientes.py) e para
+detectar os lotes alterados entre duas consultas do mesmo leilão
+(resumo_ao_vivo.py). A comparação é linear no número de lotes.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def indexar_lotes(lotes: Iterable[Dict], chave: str,
+                  duplicados: Optional[Dict[str, int]] = None) -> Dict[str, Dict]:
+    """
+    Cria um índice {chave: lote}. Lotes sem a chave informada são indexados
+    pelo ``nu_lote``.
+
+    Se a mesma chave aparecer em mais de um lote, o índice mantém o primeiro
+    e, quando ``duplicados`` é informado, registra nele {chave: ocorrências}.
+    """
+    indice = {}
+    for lote in lotes:
+        valor = lote.get(chave)
+        if valor is None:
+            valor = lote.get("nu_lote")
+        valor = str(valor)
+        if valor in indice:
+            if duplicados is not None:
+                duplicados[valor] = duplicados.get(valor, 1) + 1
+            continue
+        indice[valor] = lote
+    return indice
+
+
+def comparar_indices(anterior: Dict[str, Dict], atual: Dict[str, Dict],
+                     ignorados: Iterable[str] = ()) -> Tuple[List[str], List[str], Dict[str, Dict]]:
+    """
+    Compara dois índices de lotes.
+
+    Returns:
+        Tuple com:
+        - adicionados: chaves presentes apenas em ``atual``
+        - removidos: chaves presentes apenas em ``anterior``
+        - alterados: {chave: {campo: [valor_anterior, valor_atual]}}
+    """
+    ignorados = set(ignorados)
+    adicionados = [k for k in atual if k not in anterior]
+    removidos = [k for k in anterior if k not in atual]
+
+    alterados = {}
+    for k, lote_anterior in anterior.items():
+        lote_atual = atual.get(k)
+        if lote_atual is None or lote_atual == lote_anterior:
+            continue
+        diferencas = {
+            campo: [lote_anterior.get(campo), lote_atual.get(campo)]
+            for campo in lote_anterior.keys() | lote_atual.keys()
+            if campo not in ignorados and lote_anterior.get(campo) != lote_atual.get(campo)
+        }
+        if diferencas:
+            alterados[k] = diferencas
+
+    return adicionados, removidos, alterados
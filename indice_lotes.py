@@ -0,0 +1,110 @@
+"""
+Índice em memória dos lotes de um leilão.
+
+Construído uma vez por leilão buscado, o índice mantém os lotes em ordem
+natural de ``nu_lote`` ("2" < "12" < "12A" < "13"), permite localizar um lote
+pelo número, ``lote_id`` ou ``nm_osa`` em tempo constante e responde
+consultas de maiores/menores lotes por valor arrematado ou percentual de
+evolução com heap, sem ordenar todos os lotes.
+"""
+
+import heapq
+import re
+from typing import Dict, List, Optional, Tuple
+
+import api_leiloes
+
+# Apenas dígitos ASCII: \d também aceita dígitos Unicode como "²", que int() rejeita
+_PARTES_NUMERO = re.compile(r"([0-9]+)")
+
+CRITERIOS = ("valor", "evolucao")
+
+
+def chave_natural(nu_lote) -> Tuple:
+    """
+    Chave de ordenação natural para números de lote.
+
+    Partes numéricas são comparadas como inteiros e as demais sem diferenciar
+    maiúsculas de minúsculas, de modo que "12A" fica logo após "12". Dígitos
+    que não são ASCII ("1²", "１") são tratados como texto.
+    """
+    partes = _PARTES_NUMERO.split(str(nu_lote or "").strip())
+    return tuple(
+        (0, int(parte), "") if parte.isascii() and parte.isdigit() else (1, 0, parte.lower())
+        for parte in partes
+        if parte
+    )
+
+
+def ordenar_lotes(lotes: List[Dict]) -> None:
+    """Ordena a lista de lotes pela ordem natural de ``nu_lote``"""
+    lotes.sort(key=lambda lote: chave_natural(lote.get("nu_lote")))
+
+
+def percentual_evolucao(lote: Dict) -> Optional[float]:
+    """Retorna a evolução (%) do valor arrematado sobre o lance inicial"""
+    valor = api_leiloes.valor_arrematado(lote)
+    try:
+        minimo = float(lote.get("vl_minimo") or 0)
+    except (TypeError, ValueError):
+        minimo = 0.0
+    if valor <= 0 or minimo <= 0:
+        return None
+    return (valor / minimo - 1) * 100
+
+
+class IndiceLotes:
+    """
+    Índice dos lotes de um leilão.
+
+    Uso:
+        indice = IndiceLotes(lotes)
+        indice.buscar("12A")
+        indice.maiores(10, "valor")
+    """
+
+    def __init__(self, lotes: List[Dict]):
+        self.lotes = sorted(lotes, key=lambda lote: chave_natural(lote.get("nu_lote")))
+        self._por_nu_lote = {}
+        self._por_lote_id = {}
+        self._por_osa = {}
+        for lote in self.lotes:
+            if lote.get("nu_lote") is not None:
+                self._por_nu_lote[str(lote["nu_lote"]).strip().upper()] = lote
+            if lote.get("lote_id") is not None:
+                self._por_lote_id[str(lote["lote_id"])] = lote
+            if lote.get("nm_osa"):
+                self._por_osa[str(lote["nm_osa"]).strip()] = lote
+
+    def __len__(self) -> int:
+        return len(self.lotes)
+
+    def buscar(self, chave: str) -> Optional[Dict]:
+        """Localiza um lote pelo número, pelo lote_id ou pela OSA"""
+        chave = str(chave).strip()
+        return (
+            self._por_nu_lote.get(chave.upper())
+            or self._por_lote_id.get(chave)
+            or self._por_osa.get(chave)
+        )
+
+    def _candidatos(self, criterio: str):
+        if criterio not in CRITERIOS:
+            raise ValueError(f"Critério inválido: {criterio} (use {', '.join(CRITERIOS)})")
+        for lote in self.lotes:
+            if criterio == "valor":
+                valor = api_leiloes.valor_arrematado(lote)
+                if valor > 0:
+                    yield valor, lote
+            else:
+                evolucao = percentual_evolucao(lote)
+                if evolucao is not None:
+                    yield evolucao, lote
+
+    def maiores(self, n: int, criterio: str = "valor") -> List[Tuple[float, Dict]]:
+        """Retorna os n lotes arrematados com maior valor ou evolução"""
+        return heapq.nlargest(n, self._candidatos(criterio), key=lambda item: item[0])
+
+    def menores(self, n: int, criterio: str = "valor") -> List[Tuple[float, Dict]]:
+        """Retorna os n lotes arrematados com menor valor ou evolução"""
+        return heapq.nsmallest(n, self._candidatos(criterio), key=lambda item: item[0])
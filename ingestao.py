@@ -0,0 +1,78 @@
+"""
+Projeção de campos e internação de strings na ingestão dos lotes.
+
+A API devolve mais de 20 campos por lote, incluindo cópias dos dados do
+leilão (nome, data, leiloeiro...) em todos os lotes e campos que nenhum
+relatório usa. Cada renderizador declara os campos de que precisa e a
+ingestão mantém apenas esses campos, guardando os dados do leilão uma única
+vez no cabeçalho da lista de lotes. Valores repetidos de baixa cardinalidade
+(status, estado, tipo de alienação) são internados para que todos os lotes
+compartilhem o mesmo objeto string.
+"""
+
+import sys
+from typing import Dict, Iterable, List, Optional
+
+# Campos iguais em todos os lotes de um leilão
+CAMPOS_LEILAO = (
+    "url_leiloeiro", "leilao_id", "nm_leilao", "dt_leilao", "tipo_leilao", "nm_leiloeiro"
+)
+
+# Campos mantidos sempre, para identificar o lote
+CAMPOS_IDENTIFICACAO = ("lote_id", "nu_lote")
+
+# Campos com poucos valores distintos, internados na ingestão
+CAMPOS_INTERNADOS = ("nm_status", "nm_estado", "tp_alienacao", "tipo_arrematacao")
+
+
+class LotesLeilao(list):
+    """
+    Lista de lotes projetados. Os campos do leilão ficam em ``cabecalho``
+    em vez de repetidos em cada lote.
+    """
+
+    def __init__(self, lotes: Iterable[Dict] = (), cabecalho: Optional[Dict] = None):
+        super().__init__(lotes)
+        self.cabecalho = cabecalho if cabecalho is not None else {}
+
+
+def projetar_lote(lote: Dict, campos: Iterable[str]) -> Dict:
+    """Retorna um novo lote apenas com os campos informados presentes no original"""
+    projetado = {}
+    for campo in campos:
+        if campo in lote:
+            valor = lote[campo]
+            if campo in CAMPOS_INTERNADOS and isinstance(valor, str):
+                valor = sys.intern(valor)
+            projetado[campo] = valor
+    return projetado
+
+
+def projetar_lotes(lotes: List[Dict], campos: Iterable[str],
+                   destino: Optional[LotesLeilao] = None) -> LotesLeilao:
+    """
+    Projeta os lotes recebidos da API e os acrescenta em ``destino``.
+
+    Args:
+        lotes (List[Dict]): Lotes como recebidos da API
+        campos (Iterable[str]): Campos declarados pelos renderizadores
+        destino (LotesLeilao): Lista onde os lotes são acrescentados; se não
+            informada, uma nova lista é criada
+
+    Returns:
+        LotesLeilao: A lista de destino, com o cabeçalho do leilão preenchido
+        a partir do primeiro lote recebido
+    """
+    if destino is None:
+        destino = LotesLeilao()
+
+    campos_lote = tuple(dict.fromkeys(
+        list(CAMPOS_IDENTIFICACAO) + [c for c in campos if c not in CAMPOS_LEILAO]
+    ))
+
+    if lotes and not destino.cabecalho:
+        primeiro = lotes[0]
+        destino.cabecalho = {campo: primeiro[campo] for campo in CAMPOS_LEILAO if campo in primeiro}
+
+    destino.extend(projetar_lote(lote, campos_lote) for lote in lotes)
+    return destino
@@ -11,13 +11,21 @@ Exemplo de uso:
     python last_teste.py 15324
 """
 
-import httpx
+import transporte
+import ingestao
+import saida
+import indice_lotes
+import perfil_cpu
+import argparse
 import json
 import logging
 from typing import Dict, List, Optional
 from config2 import API_CONFIG
 
-logging.basicConfig(level=logging.INFO)
+# Campos dos lotes exibidos no relatório de homologação
+CAMPOS_RELATORIO = (
+    "nu_lote", "nm_status", "nm_osa", "vl_avaliacao", "vl_minimo", "arrematacao"
+)
 
 def fazer_requisicao(leilao_id: str) -> Optional[List[Dict]]:
     """
@@ -42,9 +50,9 @@ def fazer_requisicao(leilao_id: str) -> Optional[List[Dict]]:
     """
     Faz a requisição para a API de leilões com sistema de retry.
     """
-    print("="*50)
-    print(f"Iniciando requisição para o leilão {leilao_id}")
-    print("="*50)
+    saida.escrever("="*50)
+    saida.escrever(f"Iniciando requisição para o leilão {leilao_id}")
+    saida.escrever("="*50)
     
     # Primeiro busca os vendidos
     form_data_vendidos = {
@@ -60,68 +68,66 @@ def fazer_requisicao(leilao_id: str) -> Optional[List[Dict]]:
         "nm_vendidos": "N"  # N para não vendidos
     }
     
-    todos_lotes = []
+    todos_lotes = ingestao.LotesLeilao()
     
     try:
         # Busca lotes vendidos
-        print("\nBuscando lotes vendidos...")
-        print(f"Form data: {json.dumps(form_data_vendidos, indent=2)}")
+        saida.escrever("\nBuscando lotes vendidos...")
+        if saida.ativo(saida.LOTES):
+            saida.escrever(f"Form data: {json.dumps(form_data_vendidos, indent=2)}", saida.LOTES)
+        saida.descarregar()  # andamento visível antes da espera pela API
         
-        response_vendidos = httpx.post(
+        response_vendidos = transporte.post(
             API_CONFIG["url_test"],
             data=form_data_vendidos,
-            headers=API_CONFIG["headers"],
-            verify=False,
-            follow_redirects=True,
-            timeout=30.0
+            headers=API_CONFIG["headers"]
         )
         
         if response_vendidos.status_code == 200:
             try:
                 lotes_vendidos = response_vendidos.json()
                 if isinstance(lotes_vendidos, list):
-                    print(f"\nSucesso! Recebidos {len(lotes_vendidos)} lotes vendidos")
-                    todos_lotes.extend(lotes_vendidos)
+                    saida.escrever(f"\nSucesso! Recebidos {len(lotes_vendidos)} lotes vendidos")
+                    ingestao.projetar_lotes(lotes_vendidos, CAMPOS_RELATORIO, todos_lotes)
             except Exception as e:
-                print(f"\nErro ao processar JSON dos lotes vendidos: {e}")
+                logging.error(f"Erro ao processar JSON dos lotes vendidos: {e}")
         else:
-            print(f"\nErro na requisição de lotes vendidos: Status {response_vendidos.status_code}")
-            print("Resposta do servidor:")
-            print(response_vendidos.text[:200])
+            logging.error(f"Erro na requisição de lotes vendidos: Status {response_vendidos.status_code}")
+            logging.error(f"Resposta do servidor: {response_vendidos.text[:200]}")
         
         # Busca lotes não vendidos
-        print("\nBuscando lotes não vendidos...")
-        print(f"Form data: {json.dumps(form_data_nao_vendidos, indent=2)}")
+        saida.escrever("\nBuscando lotes não vendidos...")
+        if saida.ativo(saida.LOTES):
+            saida.escrever(f"Form data: {json.dumps(form_data_nao_vendidos, indent=2)}", saida.LOTES)
+        saida.descarregar()  # andamento visível antes da espera pela API
         
-        response_nao_vendidos = httpx.post(
+        response_nao_vendidos = transporte.post(
             API_CONFIG["url_test"],
             data=form_data_nao_vendidos,
-            headers=API_CONFIG["headers"],
-            verify=False,
-            follow_redirects=True,
-            timeout=30.0
+            headers=API_CONFIG["headers"]
         )
         
         if response_nao_vendidos.status_code == 200:
             try:
                 lotes_nao_vendidos = response_nao_vendidos.json()
                 if isinstance(lotes_nao_vendidos, list):
-                    print(f"\nSucesso! Recebidos {len(lotes_nao_vendidos)} lotes não vendidos")
-                    todos_lotes.extend(lotes_nao_vendidos)
+                    saida.escrever(f"\nSucesso! Recebidos {len(lotes_nao_vendidos)} lotes não vendidos")
+                    ingestao.projetar_lotes(lotes_nao_vendidos, CAMPOS_RELATORIO, todos_lotes)
             except Exception as e:
-                print(f"\nErro ao processar JSON dos lotes não vendidos: {e}")
+                logging.error(f"Erro ao processar JSON dos lotes não vendidos: {e}")
         else:
-            print(f"\nErro na requisição de lotes não vendidos: Status {response_nao_vendidos.status_code}")
-            print("Resposta do servidor:")
-            print(response_nao_vendidos.text[:200])
+            logging.error(f"Erro na requisição de lotes não vendidos: Status {response_nao_vendidos.status_code}")
+            logging.error(f"Resposta do servidor: {response_nao_vendidos.text[:200]}")
         
         # Mostra detalhes de todos os lotes
         if todos_lotes:
-            print(f"\nTotal de lotes encontrados: {len(todos_lotes)}")
-            print("\nDetalhes dos lotes:")
+            saida.escrever(f"\nTotal de lotes encontrados: {len(todos_lotes)}")
+            detalhar = saida.ativo(saida.LOTES)
+            if detalhar:
+                saida.escrever("\nDetalhes dos lotes:", saida.LOTES)
             
             # Ordena os lotes por número
-            todos_lotes.sort(key=lambda x: int(x.get('nu_lote', 0)))
+            indice_lotes.ordenar_lotes(todos_lotes)
             
             vendidos = []
             nao_vendidos = []
@@ -143,50 +149,79 @@ def fazer_requisicao(leilao_id: str) -> Optional[List[Dict]]:
                 else:
                     nao_vendidos.append(info_lote)
                 
-                print(f"\nLote {info_lote['numero']}:")
-                print(f"- Status: {status}")
-                print(f"- OSA: {lote.get('nm_osa', 'N/A')}")
-                print(f"- Valor Avaliação: R$ {info_lote['valor_avaliacao']:,.2f}")
-                print(f"- Valor Mínimo: R$ {info_lote['valor_minimo']:,.2f}")
-                if valor_arrematado > 0:
-                    print(f"- Valor Arrematado: R$ {valor_arrematado:,.2f}")
+                if detalhar:
+                    saida.escrever(f"\nLote {info_lote['numero']}:", saida.LOTES)
+                    saida.escrever(f"- Status: {status}", saida.LOTES)
+                    saida.escrever(f"- OSA: {lote.get('nm_osa', 'N/A')}", saida.LOTES)
+                    saida.escrever(f"- Valor Avaliação: R$ {info_lote['valor_avaliacao']:,.2f}", saida.LOTES)
+                    saida.escrever(f"- Valor Mínimo: R$ {info_lote['valor_minimo']:,.2f}", saida.LOTES)
+                    if valor_arrematado > 0:
+                        saida.escrever(f"- Valor Arrematado: R$ {valor_arrematado:,.2f}", saida.LOTES)
             
             # Resumo do leilão
-            print("\n" + "="*50)
-            print("RESUMO DO LEILÃO")
-            print("="*50)
-            print(f"Total de lotes: {len(todos_lotes)}")
-            print(f"Lotes vendidos: {len(vendidos)}")
-            print(f"Lotes não vendidos: {len(nao_vendidos)}")
+            dados_resumo = {
+                "leilao_id": str(leilao_id),
+                "total_lotes": len(todos_lotes),
+                "lotes_vendidos": len(vendidos),
+                "lotes_nao_vendidos": len(nao_vendidos),
+                "valor_total_arrematado": 0.0,
+            }
+            linhas_resumo = [
+                "\n" + "="*50,
+                "RESUMO DO LEILÃO",
+                "="*50,
+                f"Total de lotes: {len(todos_lotes)}",
+                f"Lotes vendidos: {len(vendidos)}",
+                f"Lotes não vendidos: {len(nao_vendidos)}",
+            ]
             
             if vendidos:
                 total_arrematado = sum(l['valor_arrematado'] for l in vendidos)
-                print(f"\nValor total arrematado: R$ {total_arrematado:,.2f}")
-                
                 menor_valor = min(vendidos, key=lambda x: x['valor_arrematado'])
                 maior_valor = max(vendidos, key=lambda x: x['valor_arrematado'])
                 
-                print(f"Menor valor arrematado: R$ {menor_valor['valor_arrematado']:,.2f} (Lote {menor_valor['numero']})")
-                print(f"Maior valor arrematado: R$ {maior_valor['valor_arrematado']:,.2f} (Lote {maior_valor['numero']})")
+                dados_resumo.update({
+                    "valor_total_arrematado": round(total_arrematado, 2),
+                    "menor_valor_arrematado": {"valor": menor_valor['valor_arrematado'], "lote": menor_valor['numero']},
+                    "maior_valor_arrematado": {"valor": maior_valor['valor_arrematado'], "lote": maior_valor['numero']},
+                })
+                linhas_resumo += [
+                    f"\nValor total arrematado: R$ {total_arrematado:,.2f}",
+                    f"Menor valor arrematado: R$ {menor_valor['valor_arrematado']:,.2f} (Lote {menor_valor['numero']})",
+                    f"Maior valor arrematado: R$ {maior_valor['valor_arrematado']:,.2f} (Lote {maior_valor['numero']})",
+                ]
+            
+            saida.resumo(dados_resumo, linhas_resumo)
+            saida.descarregar()
             
             return todos_lotes
         else:
-            print("\nNenhum lote encontrado!")
+            logging.error("Nenhum lote encontrado!")
             
     except Exception as e:
-        print("\nErro ao fazer requisição:")
-        print(str(e))
+        logging.error(f"Erro ao fazer requisição: {e}")
     
     return None
 
 if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) != 2:
-        print("Uso: python last_teste.py <id_leilao>")
-        print("\nExemplo:")
-        print("  python last_teste.py 15324")
-        sys.exit(1)
-    
-    leilao_id = sys.argv[1]
-    fazer_requisicao(leilao_id)
+    logging.basicConfig(level=logging.INFO)
+
+    # O ambiente de homologação é acessado sem verificação de certificado
+    transporte.configurar_transporte(verify=False)
+
+    parser = argparse.ArgumentParser(description="Relatório de lotes do ambiente de homologação",
+                                     epilog="Exemplo: python last_teste.py 15324 --verbosidade lotes")
+    parser.add_argument("leilao_id", help="ID do leilão a ser consultado")
+    parser.add_argument("--verbosidade", choices=list(saida.NIVEIS), default="resumo",
+                        help="Detalhamento da saída no console (padrão: resumo)")
+    parser.add_argument("--json", action="store_true",
+                        help="Emite apenas o resumo do leilão em JSON")
+    perfil_cpu.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    saida.configurar_saida(nivel=args.verbosidade, formato="json" if args.json else "texto")
+    if args.json or args.verbosidade == "silencioso":
+        logging.getLogger().setLevel(logging.WARNING)
+
+    with perfil_cpu.perfilar(args, globals()):
+        fazer_requisicao(args.leilao_id)
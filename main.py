@@ -1,8 +1,16 @@
 import logging
 import time
 import json
-from typing import Dict, List, Optional
-import httpx
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import transporte
+import ingestao
+import api_leiloes
+import saida
+import resumo
+import consolidado
+import ordenacao_externa
+import indice_lotes
+import perfil_cpu
 from config import API_CONFIG, REQUEST_CONFIG, FILE_CONFIG
 import pandas as pd
 import re
@@ -10,17 +18,10 @@ import argparse
 import sys
 import io
 
-# Configurar a codificação da saída
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('leiloes.log', encoding='utf-8', mode='w'),  # Modo 'w' para limpar o arquivo a cada execução
-        logging.StreamHandler()
-    ]
+# Campos dos lotes usados pelo relatório Excel (processar_lote)
+CAMPOS_RELATORIO_EXCEL = (
+    "nu_lote", "nm_osa", "nm_status", "nm_descricao_vistoria",
+    "vl_avaliacao", "vl_minimo", "arrematacao"
 )
 
 def validar_resposta(data: List[Dict]) -> bool:
@@ -52,13 +53,20 @@ def validar_resposta(data: List[Dict]) -> bool:
 
     return True
 
-def fazer_requisicao(leilao_id: str) -> Optional[List[Dict]]:
+def fazer_requisicao(leilao_id: str,
+                     campos: Iterable[str] = CAMPOS_RELATORIO_EXCEL,
+                     destino=None, url: Optional[str] = None) -> Optional[List[Dict]]:
     """
     Faz a requisição para a API de leilões com sistema de retry.
+    Mantém em cada lote apenas os campos informados; os dados do leilão ficam
+    em ``cabecalho`` da lista retornada.
+    Com destino (por exemplo, um OrdenadorExterno) os lotes são acrescentados
+    nele em vez de em uma lista em memória. Sem url, usa API_CONFIG["url"].
     """
-    print("="*50)
-    print(f"Iniciando requisição para o leilão {leilao_id}")
-    print("="*50)
+    url = url or API_CONFIG["url"]
+    saida.escrever("="*50)
+    saida.escrever(f"Iniciando requisição para o leilão {leilao_id}")
+    saida.escrever("="*50)
     
     # Primeiro busca os vendidos
     form_data_vendidos = {
@@ -74,72 +82,64 @@ def fazer_requisicao(leilao_id: str) -> Optional[List[Dict]]:
         "nm_vendidos": "N"  # N para não vendidos
     }
     
-    todos_lotes = []
+    todos_lotes = destino if destino is not None else ingestao.LotesLeilao()
     
     try:
         # Busca lotes vendidos
-        print("\nBuscando lotes vendidos...")
-        print(f"Form data: {json.dumps(form_data_vendidos, indent=2)}")
+        saida.escrever("\nBuscando lotes vendidos...")
+        if saida.ativo(saida.LOTES):
+            saida.escrever(f"Form data: {json.dumps(form_data_vendidos, indent=2)}", saida.LOTES)
+        saida.descarregar()  # andamento visível antes da espera pela API
         
-        response_vendidos = httpx.post(
-            API_CONFIG["url"],
+        response_vendidos = transporte.post(
+            url,
             data=form_data_vendidos,
-            headers=API_CONFIG["headers"],
-            verify=False,
-            follow_redirects=True,
-            timeout=30.0
+            headers=API_CONFIG["headers"]
         )
         
         if response_vendidos.status_code == 200:
             try:
                 lotes_vendidos = response_vendidos.json()
                 if isinstance(lotes_vendidos, list):
-                    print(f"\nSucesso! Recebidos {len(lotes_vendidos)} lotes vendidos")
-                    todos_lotes.extend(lotes_vendidos)
+                    saida.escrever(f"\nSucesso! Recebidos {len(lotes_vendidos)} lotes vendidos")
+                    ingestao.projetar_lotes(lotes_vendidos, campos, todos_lotes)
             except Exception as e:
-                print(f"\nErro ao processar JSON dos lotes vendidos: {e}")
+                logging.error(f"Erro ao processar JSON dos lotes vendidos: {e}")
         
         # Busca lotes não vendidos
-        print("\nBuscando lotes não vendidos...")
-        print(f"Form data: {json.dumps(form_data_nao_vendidos, indent=2)}")
+        saida.escrever("\nBuscando lotes não vendidos...")
+        if saida.ativo(saida.LOTES):
+            saida.escrever(f"Form data: {json.dumps(form_data_nao_vendidos, indent=2)}", saida.LOTES)
+        saida.descarregar()  # andamento visível antes da espera pela API
         
-        response_nao_vendidos = httpx.post(
-            API_CONFIG["url"],
+        response_nao_vendidos = transporte.post(
+            url,
             data=form_data_nao_vendidos,
-            headers=API_CONFIG["headers"],
-            verify=False,
-            follow_redirects=True,
-            timeout=30.0
+            headers=API_CONFIG["headers"]
         )
         
         if response_nao_vendidos.status_code == 200:
             try:
                 lotes_nao_vendidos = response_nao_vendidos.json()
                 if isinstance(lotes_nao_vendidos, list):
-                    print(f"\nSucesso! Recebidos {len(lotes_nao_vendidos)} lotes não vendidos")
-                    todos_lotes.extend(lotes_nao_vendidos)
+                    saida.escrever(f"\nSucesso! Recebidos {len(lotes_nao_vendidos)} lotes não vendidos")
+                    ingestao.projetar_lotes(lotes_nao_vendidos, campos, todos_lotes)
             except Exception as e:
-                print(f"\nErro ao processar JSON dos lotes não vendidos: {e}")
+                logging.error(f"Erro ao processar JSON dos lotes não vendidos: {e}")
         
-        # Mostra detalhes de todos os lotes
         if todos_lotes:
-            print(f"\nTotal de lotes encontrados: {len(todos_lotes)}")
-            print("\nDetalhes dos lotes:")
-            for lote in todos_lotes:
-                print(f"\nLote {lote.get('nu_lote', 'N/A')}:")
-                print(f"- Status: {lote.get('nm_status', 'N/A')}")
-                print(f"- OSA: {lote.get('nm_osa', 'N/A')}")
-                print(f"- Valor Avaliação: R$ {float(lote.get('vl_avaliacao', 0)):,.2f}")
-                print(f"- Valor Mínimo: R$ {float(lote.get('vl_minimo', 0)):,.2f}")
-                if isinstance(lote.get('arrematacao'), dict):
-                    print(f"- Valor Arrematado: R$ {float(lote['arrematacao'].get('vl', 0)):,.2f}")
+            saida.escrever(f"\nTotal de lotes encontrados: {len(todos_lotes)}")
+            # Ordena por número do lote (o OrdenadorExterno já entrega em ordem).
+            # O detalhamento e o resumo são gerados na mesma passagem que o relatório
+            if destino is None:
+                indice_lotes.ordenar_lotes(todos_lotes)
+            saida.descarregar()
             return todos_lotes
         else:
-            print("\nNenhum lote encontrado!")
+            logging.error("Nenhum lote encontrado!")
             
     except Exception as e:
-        print("\nErro ao fazer requisição:")
-        print(str(e))
+        logging.error(f"Erro ao fazer requisição: {e}")
     
     return None
 
@@ -147,12 +147,9 @@ def processar_lote(item: Dict) -> Dict:
     """
     Processa um lote individual e retorna um dicionário com os dados formatados.
     """
-    def format_money(value: float) -> str:
-        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
     valor_avaliado = float(item.get("vl_avaliacao", 0))
     lance_inicial = float(item.get("vl_minimo", 0))
-    valor_arrematado = float(item.get("arrematacao", {}).get("vl", 0))
+    valor_arrematado = api_leiloes.valor_arrematado(item)
 
     # Calcular Percentual de Evolução (%)
     percentual_evolucao = 0
@@ -163,144 +160,294 @@ def processar_lote(item: Dict) -> Dict:
     status = item.get("nm_status", "").strip().upper()
     is_vendido = status == "VENDIDO"
 
-    # Log dos dados do lote sendo processado
-    logging.info(f"Processando lote {item.get('nu_lote')}:")
-    logging.info(f"  - OSA: {item.get('nm_osa')}")
-    logging.info(f"  - Status original: {item.get('nm_status')}")
-    logging.info(f"  - Status normalizado: {status}")
-    logging.info(f"  - Valor arrematado: {valor_arrematado}")
-    logging.info(f"  - É vendido? {is_vendido}")
+    # Log dos dados do lote sendo processado (apenas na verbosidade "lotes")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"Processando lote {item.get('nu_lote')}:")
+        logging.debug(f"  - OSA: {item.get('nm_osa')}")
+        logging.debug(f"  - Status original: {item.get('nm_status')}")
+        logging.debug(f"  - Status normalizado: {status}")
+        logging.debug(f"  - Valor arrematado: {valor_arrematado}")
+        logging.debug(f"  - É vendido? {is_vendido}")
 
     return {
         "N° Lote": item.get("nu_lote"),
         "OSA": item.get("nm_osa"),  
         "Status": status,
         "Descrição do bem": re.sub(r"<.*?>", "", item.get("nm_descricao_vistoria", "")),
-        "Valor avaliado": format_money(valor_avaliado),
-        "Lance inicial": format_money(lance_inicial),
-        "Valor arrematado": format_money(valor_arrematado),
+        "Valor avaliado": resumo.formatar_moeda(valor_avaliado),
+        "Lance inicial": resumo.formatar_moeda(lance_inicial),
+        "Valor arrematado": resumo.formatar_moeda(valor_arrematado),
         "Percentual de evolução (%)": f"{round(percentual_evolucao, 2)}%",
         "is_vendido": is_vendido  
     }
 
-def gerar_relatorio(data: List[Dict]) -> bool:
+def escrever_detalhes_lote(lote: Dict) -> None:
+    """Escreve no console o detalhamento de um lote (verbosidade "lotes")"""
+    saida.escrever(f"\nLote {lote.get('nu_lote', 'N/A')}:", saida.LOTES)
+    saida.escrever(f"- Status: {lote.get('nm_status', 'N/A')}", saida.LOTES)
+    saida.escrever(f"- OSA: {lote.get('nm_osa', 'N/A')}", saida.LOTES)
+    saida.escrever(f"- Valor Avaliação: R$ {float(lote.get('vl_avaliacao', 0)):,.2f}", saida.LOTES)
+    saida.escrever(f"- Valor Mínimo: R$ {float(lote.get('vl_minimo', 0)):,.2f}", saida.LOTES)
+    if isinstance(lote.get('arrematacao'), dict):
+        saida.escrever(f"- Valor Arrematado: R$ {float(lote['arrematacao'].get('vl', 0)):,.2f}", saida.LOTES)
+
+def iterar_lotes_processados(data: Iterable[Dict], quadro: resumo.QuadroResumo) -> Iterator[Dict]:
     """
-    Gera o relatório Excel com os dados dos lotes.
-    Retorna True se o relatório foi gerado com sucesso.
+    Processa os lotes um a um, contabilizando cada lote no quadro resumo e
+    escrevendo o detalhamento no console, se ativo.
+    Não mantém os lotes em memória.
     """
-    try:
-        logging.info("Iniciando processamento dos lotes...")
-        lotes = []
-        total_arrematados = 0
-        total_nao_arrematados = 0
-
-        # Processamento dos lotes
-        for item in data:
-            lote_processado = processar_lote(item)
-            lotes.append(lote_processado)
-            
-            # Contagem baseada no campo is_vendido
-            is_vendido = lote_processado["is_vendido"]
-            logging.info(f"Analisando status do lote {item.get('nu_lote')}:")
-            logging.info(f"  - Status: {lote_processado['Status']}")
-            logging.info(f"  - É vendido? {is_vendido}")
-            
+    detalhar = logging.getLogger().isEnabledFor(logging.DEBUG)
+    exibir = saida.ativo(saida.LOTES)
+    if exibir:
+        saida.escrever("\nDetalhes dos lotes:", saida.LOTES)
+    for item in data:
+        if exibir:
+            escrever_detalhes_lote(item)
+        lote_processado = processar_lote(item)
+        
+        # Contagem baseada no campo is_vendido
+        is_vendido = lote_processado.pop("is_vendido")
+        quadro.adicionar(is_vendido, api_leiloes.valor_arrematado(item))
+        if detalhar:
+            logging.debug(f"Analisando status do lote {item.get('nu_lote')}:")
+            logging.debug(f"  - Status: {lote_processado['Status']}")
+            logging.debug(f"  - É vendido? {is_vendido}")
             if is_vendido:
-                total_arrematados += 1
-                logging.info("  → Contabilizado como arrematado")
+                logging.debug("  → Contabilizado como arrematado")
             else:
-                total_nao_arrematados += 1
-                logging.info("  → Contabilizado como não arrematado")
+                logging.debug("  → Contabilizado como não arrematado")
 
-        logging.info("=== RESUMO DA CONTAGEM ===")
-        logging.info(f"Total de lotes processados: {len(lotes)}")
-        logging.info(f"Lotes arrematados: {total_arrematados}")
-        logging.info(f"Lotes não arrematados: {total_nao_arrematados}")
+        yield lote_processado
 
-        # Remover campo auxiliar antes de salvar
-        for lote in lotes:
-            del lote["is_vendido"]
+def registrar_contagem(quadro: resumo.QuadroResumo) -> None:
+    """Registra no log o resumo da contagem dos lotes"""
+    logging.info("=== RESUMO DA CONTAGEM ===")
+    logging.info(f"Total de lotes processados: {quadro.total_lotes}")
+    logging.info(f"Lotes arrematados: {quadro.total_arrematados}")
+    logging.info(f"Lotes não arrematados: {quadro.total_nao_arrematados}")
 
-        # Criar DataFrames
-        df_lotes = pd.DataFrame(lotes)
+def exibir_resumo(leilao_id: str, quadro: resumo.QuadroResumo) -> None:
+    """Registra na saída o resumo do leilão, contabilizado durante a geração do relatório"""
+    saida.resumo(
+        {
+            "leilao_id": str(leilao_id),
+            "total_lotes": quadro.total_lotes,
+            "lotes_vendidos": quadro.total_arrematados,
+            "lotes_nao_vendidos": quadro.total_nao_arrematados,
+            "valor_total_arrematado": round(quadro.valor_total_arrematado, 2),
+        },
+        [
+            f"Lotes vendidos: {quadro.total_arrematados}",
+            f"Lotes não vendidos: {quadro.total_nao_arrematados}",
+            f"Valor total arrematado: R$ {quadro.valor_total_arrematado:,.2f}",
+        ]
+    )
+    saida.descarregar()
 
-        # Calcular valores para o quadro resumo
-        total_lotes = len(lotes)
-        perc_arrematados = (total_arrematados / total_lotes * 100) if total_lotes > 0 else 0
-        perc_nao_arrematados = (total_nao_arrematados / total_lotes * 100) if total_lotes > 0 else 0
-        
-        # Calcular valor total arrematado
-        valor_total_arrematado = sum(
-            float(re.sub(r'[^\d,]', '', lote['Valor arrematado']).replace(',', '.'))
-            for lote in lotes
-            if lote['Status'] == 'VENDIDO'
-        )
+def processar_lotes(data: List[Dict],
+                    quadro: Optional[resumo.QuadroResumo] = None) -> Tuple[List[Dict], resumo.QuadroResumo]:
+    """
+    Processa todos os lotes e calcula o quadro resumo.
+    Retorna os lotes formatados para a planilha e o QuadroResumo (o informado,
+    se houver).
+    """
+    logging.info("Iniciando processamento dos lotes...")
+    quadro = quadro if quadro is not None else resumo.QuadroResumo()
+    lotes = list(iterar_lotes_processados(data, quadro))
+    registrar_contagem(quadro)
+    return lotes, quadro
+
+def gerar_relatorio(data: List[Dict], quadro: Optional[resumo.QuadroResumo] = None,
+                    arquivo: Optional[str] = None) -> bool:
+    """
+    Gera o relatório Excel com os dados dos lotes. Com quadro, os lotes são
+    contabilizados nele. Sem arquivo, grava em FILE_CONFIG["output_file"].
+    Retorna True se o relatório foi gerado com sucesso.
+    """
+    arquivo = arquivo or FILE_CONFIG["output_file"]
+    try:
+        lotes, quadro = processar_lotes(data, quadro)
 
-        df_resumo = pd.DataFrame({
-            "QUADRO RESUMO": [
-                "TOTAL DE LOTES",
-                "TOTAL DE LOTES ARREMATADOS",
-                "PERCENTUAL DE LOTES ARREMATADOS",
-                "TOTAL DE LOTES NÃO ARREMATADOS",
-                "PERCENTUAL DE LOTES NÃO ARREMATADOS",
-                "VALOR TOTAL ARREMATADO"
-            ],
-            "Quantidade": [
-                total_lotes,
-                total_arrematados,
-                f"{perc_arrematados:.2f}%",
-                total_nao_arrematados,
-                f"{perc_nao_arrematados:.2f}%",
-                f"R$ {valor_total_arrematado:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            ]
-        })
+        # Criar DataFrames
+        df_lotes = pd.DataFrame(lotes)
+        df_resumo = pd.DataFrame(quadro.tabela())
 
         # Tentar salvar no Excel
         try:
-            logging.info(f"Salvando relatório em {FILE_CONFIG['output_file']}...")
-            with pd.ExcelWriter(FILE_CONFIG["output_file"], engine="openpyxl") as writer:
+            logging.info(f"Salvando relatório em {arquivo}...")
+            with pd.ExcelWriter(arquivo, engine="openpyxl") as writer:
                 df_lotes.to_excel(writer, sheet_name=FILE_CONFIG["sheets"]["lotes"], index=False)
                 df_resumo.to_excel(writer, sheet_name=FILE_CONFIG["sheets"]["resumo"], index=False)
             logging.info("Arquivo Excel salvo com sucesso")
         except PermissionError:
-            logging.error(f"Erro: O arquivo {FILE_CONFIG['output_file']} está aberto. Feche-o e tente novamente.")
+            logging.error(f"Erro: O arquivo {arquivo} está aberto. Feche-o e tente novamente.")
             return False
         except Exception as e:
             logging.error(f"Erro ao salvar arquivo: {e}")
             return False
 
-        logging.info(f"Relatório gerado com sucesso: {FILE_CONFIG['output_file']}")
+        logging.info(f"Relatório gerado com sucesso: {arquivo}")
+        return True
+
+    except Exception as e:
+        logging.error(f"Erro ao gerar relatório: {e}")
+        return False
+
+def gerar_relatorio_em_fluxo(data: Iterable[Dict], quadro: Optional[resumo.QuadroResumo] = None,
+                             arquivo: Optional[str] = None) -> bool:
+    """
+    Gera o relatório Excel escrevendo os lotes linha a linha (openpyxl em modo
+    write-only), sem montar DataFrames. Usado com o limite de memória, em que
+    os lotes chegam ordenados do OrdenadorExterno; são percorridos uma única
+    vez. Com quadro, os lotes são contabilizados nele. Sem arquivo, grava em
+    FILE_CONFIG["output_file"].
+    Retorna True se o relatório foi gerado com sucesso.
+    """
+    from openpyxl import Workbook
+
+    arquivo = arquivo or FILE_CONFIG["output_file"]
+    try:
+        logging.info("Iniciando processamento dos lotes...")
+        logging.info(f"Salvando relatório em {arquivo}...")
+        quadro = quadro if quadro is not None else resumo.QuadroResumo()
+        wb = Workbook(write_only=True)
+        ws_lotes = wb.create_sheet(FILE_CONFIG["sheets"]["lotes"])
+
+        for i, lote in enumerate(iterar_lotes_processados(data, quadro)):
+            if i == 0:
+                ws_lotes.append(list(lote.keys()))
+            ws_lotes.append(list(lote.values()))
+        registrar_contagem(quadro)
+
+        ws_resumo = wb.create_sheet(FILE_CONFIG["sheets"]["resumo"])
+        tabela = quadro.tabela()
+        ws_resumo.append(list(tabela.keys()))
+        for linha in zip(*tabela.values()):
+            ws_resumo.append(list(linha))
+
+        try:
+            wb.save(arquivo)
+            logging.info("Arquivo Excel salvo com sucesso")
+        except PermissionError:
+            logging.error(f"Erro: O arquivo {arquivo} está aberto. Feche-o e tente novamente.")
+            return False
+
+        logging.info(f"Relatório gerado com sucesso: {arquivo}")
         return True
 
     except Exception as e:
         logging.error(f"Erro ao gerar relatório: {e}")
         return False
 
-def main(leilao_id: str):
+def main(leilao_id: str, pasta_consolidado: Optional[str] = None,
+         limite_memoria_mb: Optional[float] = None):
     """
     Função principal que coordena o processo de coleta e geração do relatório.
+    Com pasta_consolidado, o leilão é acrescentado ao consolidado em vez de
+    gerar o relatório individual. Com limite_memoria_mb, os lotes são
+    ordenados por número com uso de disco acima do limite e os relatórios são
+    gerados em fluxo.
     """
     logging.info(f"Iniciando busca de dados para o leilão {leilao_id}")
-    
+
+    if limite_memoria_mb:
+        destino = ordenacao_externa.OrdenadorExterno(int(limite_memoria_mb * 1024 * 1024))
+    else:
+        destino = None
+
+    try:
+        _executar(leilao_id, pasta_consolidado, destino)
+    finally:
+        if destino is not None:
+            destino.fechar()
+
+def _executar(leilao_id: str, pasta_consolidado: Optional[str], destino):
+    """Busca os lotes e gera o relatório ou acrescenta o leilão ao consolidado"""
     # Busca os dados
-    data = fazer_requisicao(leilao_id)
+    data = fazer_requisicao(leilao_id, destino=destino)
     if not data:
         logging.error("Não foi possível obter os dados do leilão")
         return
 
     # Valida o formato da resposta
-    if not isinstance(data, list):
+    if destino is None and not isinstance(data, list):
         logging.error("Erro: Resposta inesperada da API. Estrutura incorreta.")
         return
 
+    # O quadro resumo é preenchido durante a geração do relatório ou da
+    # planilha do consolidado, na mesma passagem pelos lotes
+    quadro = resumo.QuadroResumo()
+
+    # Acrescenta o leilão ao consolidado
+    if pasta_consolidado:
+        try:
+            logging.info("Iniciando processamento dos lotes...")
+            lotes = iterar_lotes_processados(data, quadro)
+            nm_leilao = data.cabecalho.get("nm_leilao") or f"LEILÃO {leilao_id}"
+            consolidado.adicionar_leilao(pasta_consolidado, leilao_id, nm_leilao, lotes, quadro)
+            registrar_contagem(quadro)
+            logging.info(f"Leilão {leilao_id} acrescentado em {pasta_consolidado}")
+        except PermissionError as e:
+            logging.error(f"Erro: O arquivo {e.filename} está aberto. Feche-o e tente novamente.")
+            return
+        except Exception as e:
+            logging.error(f"Erro ao atualizar o consolidado: {e}")
+            return
+        exibir_resumo(leilao_id, quadro)
+        return
+
     # Gera o relatório
-    if not gerar_relatorio(data):
+    gerar = gerar_relatorio if destino is None else gerar_relatorio_em_fluxo
+    if not gerar(data, quadro):
         logging.error("Falha ao gerar relatório.")
         return
+    exibir_resumo(leilao_id, quadro)
 
 if __name__ == "__main__":
+    # Configurar a codificação da saída
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
     parser = argparse.ArgumentParser(description="Gerador de relatório de leilões")
     parser.add_argument("leilao_id", help="ID do leilão para buscar os lotes")
+    parser.add_argument("--verbosidade", choices=list(saida.NIVEIS), default="resumo",
+                        help="Detalhamento da saída no console (padrão: resumo)")
+    parser.add_argument("--json", action="store_true",
+                        help="Emite apenas o resumo do leilão em JSON")
+    parser.add_argument("--consolidado", metavar="PASTA",
+                        help="Acrescenta o leilão ao consolidado da pasta (uma planilha por leilão e o "
+                             "RESUMO GERAL) em vez de gerar o relatório individual")
+    parser.add_argument("--limite-memoria", type=float, metavar="MB",
+                        help="Limite aproximado de memória para os lotes; acima dele os lotes são "
+                             "ordenados em disco (arquivos temporários) e o relatório é gerado em fluxo")
+    perfil_cpu.adicionar_argumentos(parser)
     args = parser.parse_args()
-    
-    main(args.leilao_id)
+
+    if args.limite_memoria is not None and args.limite_memoria <= 0:
+        parser.error("--limite-memoria deve ser maior que zero")
+
+    saida.configurar_saida(nivel=args.verbosidade, formato="json" if args.json else "texto")
+
+    # Configuração do logging
+    # O detalhamento de cada lote (DEBUG) só é gerado na verbosidade "lotes";
+    # nas demais o arquivo de log recebe as mensagens de andamento (INFO)
+    nivel_log = logging.DEBUG if args.verbosidade == "lotes" else logging.INFO
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.WARNING if args.json or args.verbosidade == "silencioso" else nivel_log)
+    logging.basicConfig(
+        level=nivel_log,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('leiloes.log', encoding='utf-8', mode='w'),  # Modo 'w' para limpar o arquivo a cada execução
+            console_handler
+        ]
+    )
+    # O rastreamento de conexões do httpx/httpcore não entra no log
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+    # A API de produção é acessada sem verificação de certificado
+    transporte.configurar_transporte(verify=False)
+
+    with perfil_cpu.perfilar(args, globals()):
+        main(args.leilao_id, args.consolidado, args.limite_memoria)
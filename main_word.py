@@ -1,4 +1,9 @@
-import httpx
+import transporte
+import ingestao
+import volumes_word
+import indice_lotes
+import ordenacao_externa
+import perfil_cpu
 import json
 import logging
 from config import API_CONFIG
@@ -6,6 +11,7 @@ from docx import Document
 from docx.shared import Inches, Pt, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_ALIGN_VERTICAL
+import argparse
 import locale
 from datetime import datetime
 
@@ -18,6 +24,13 @@ except:
     except:
         pass
 
+# Campos dos lotes usados pela tabela do relatório (criar_tabela_lotes)
+CAMPOS_RELATORIO_WORD = (
+    'nm_osa', 'nu_lote', 'tp_alienacao', 'descricao', 'nm_descricao_vistoria',
+    'nm_status', 'nm_usuario', 'nm_estado', 'nm_cpfoucnpj', 'vl_avaliacao',
+    'vl_minimo', 'vl'
+)
+
 def formatar_moeda(valor):
     """Formata um valor para o formato de moeda brasileira"""
     try:
@@ -119,8 +132,71 @@ def criar_tabela_lotes(doc, lotes):
             run = cell.paragraphs[0].runs[0]
             run.font.size = Pt(9)
 
-def fazer_requisicao(leilao_id):
-    """Faz a requisição para a API de leilões e gera relatório em Word"""
+def gerar_documento(lotes, nm_leilao, output_file, gerado_em=None):
+    """Gera o documento Word com o cabeçalho, a tabela de lotes e o rodapé"""
+    # Criar documento Word
+    doc = Document()
+    
+    # Configurar margens (2.5cm em todas as bordas)
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Cm(2.5)
+        section.bottom_margin = Cm(2.5)
+        section.left_margin = Cm(2.5)
+        section.right_margin = Cm(2.5)
+
+    # Criar cabeçalho e tabela
+    criar_cabecalho(doc, nm_leilao)
+    criar_tabela_lotes(doc, lotes)
+
+    # Adicionar data e hora no rodapé
+    footer = doc.sections[0].footer
+    footer_para = footer.paragraphs[0]
+    footer_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    now = gerado_em or datetime.now()
+    footer_para.text = f'Gerado em: {now.strftime("%d/%m/%Y %H:%M:%S")}'
+
+    # Salvar documento
+    doc.save(output_file)
+
+def fazer_requisicao(leilao_id, lotes_por_volume=None, processos=None, compactar=False,
+                     limite_memoria_mb=None):
+    """
+    Faz a requisição para a API de leilões e gera relatório em Word.
+    Com lotes_por_volume o relatório é dividido em volumes gerados em paralelo.
+    Com limite_memoria_mb os lotes são ordenados com uso de disco acima do
+    limite e lidos volume a volume (requer lotes_por_volume); nesse caso o
+    retorno é o OrdenadorExterno, ainda aberto, e quem chama deve fechá-lo
+    (fechar() ou with) depois de usar os lotes.
+    """
+    if not limite_memoria_mb:
+        return _fazer_requisicao(leilao_id, lotes_por_volume, processos, compactar)
+
+    destino = ordenacao_externa.OrdenadorExterno(int(limite_memoria_mb * 1024 * 1024))
+    try:
+        todos_lotes = _fazer_requisicao(leilao_id, lotes_por_volume, processos, compactar, destino)
+    except BaseException:
+        destino.fechar()
+        raise
+    if todos_lotes is None:
+        destino.fechar()
+    return todos_lotes
+
+def _fazer_requisicao(leilao_id, lotes_por_volume, processos, compactar, destino=None):
+    todos_lotes, nm_leilao = buscar_lotes(leilao_id, destino)
+    if todos_lotes is None:
+        return None
+    gerar_relatorio(todos_lotes, nm_leilao, f'relatorio_leilao_{leilao_id}', lotes_por_volume,
+                    processos, compactar)
+    return todos_lotes
+
+def buscar_lotes(leilao_id, destino=None, url=None):
+    """
+    Busca o nome do leilão e os lotes vendidos e não vendidos, já ordenados.
+    Sem url, usa API_CONFIG['url_prod']. Retorna (lotes, nm_leilao), ou
+    (None, None) se nenhum lote for obtido.
+    """
+    url = url or API_CONFIG['url_prod']
     print('='*50)
     print(f'Iniciando requisição para o leilão {leilao_id}')
     print('='*50)
@@ -130,18 +206,18 @@ def fazer_requisicao(leilao_id):
         form_data = {
             'leilao_id': leilao_id
         }
-        response = httpx.post(API_CONFIG['url_prod'].replace('buscar-lotes', 'buscar-leilao'), 
-                            data=form_data, headers=API_CONFIG['headers'])
+        response = transporte.post(url.replace('buscar-lotes', 'buscar-leilao'), 
+                                 data=form_data, headers=API_CONFIG['headers'])
         if response.status_code == 200:
             leilao_info = response.json()
-            nm_leilao = leilao_info.get('nm_leilao', f'LEILÃO {leilao_id}')
+            nm_leilao = leilao_info.get('nm_leilao')
         else:
-            nm_leilao = f'LEILÃO {leilao_id}'
+            nm_leilao = None
     except Exception as e:
         print(f'Erro ao buscar informações do leilão: {str(e)}')
-        nm_leilao = f'LEILÃO {leilao_id}'
+        nm_leilao = None
 
-    todos_lotes = []
+    todos_lotes = destino if destino is not None else ingestao.LotesLeilao()
     
     # Buscar lotes vendidos
     print('Buscando lotes vendidos...')
@@ -150,70 +226,88 @@ def fazer_requisicao(leilao_id):
             'leilao_id': leilao_id,
             'nm_vendidos': 'S'
         }
-        response = httpx.post(API_CONFIG['url_prod'], data=form_data, headers=API_CONFIG['headers'])
+        response = transporte.post(url, data=form_data, headers=API_CONFIG['headers'])
         if response.status_code == 200:
             lotes_vendidos = response.json()
-            todos_lotes.extend(lotes_vendidos)
+            ingestao.projetar_lotes(lotes_vendidos, CAMPOS_RELATORIO_WORD, todos_lotes)
     except Exception as e:
         print(f'Erro ao buscar lotes vendidos: {str(e)}')
-        return None
+        return None, None
 
     # Buscar lotes não vendidos
     print('Buscando lotes não vendidos...')
     try:
         form_data['nm_vendidos'] = 'N'
-        response = httpx.post(API_CONFIG['url_prod'], data=form_data, headers=API_CONFIG['headers'])
+        response = transporte.post(url, data=form_data, headers=API_CONFIG['headers'])
         if response.status_code == 200:
             lotes_nao_vendidos = response.json()
-            todos_lotes.extend(lotes_nao_vendidos)
+            ingestao.projetar_lotes(lotes_nao_vendidos, CAMPOS_RELATORIO_WORD, todos_lotes)
     except Exception as e:
         print(f'Erro ao buscar lotes não vendidos: {str(e)}')
-        return None
+        return None, None
 
-    if not todos_lotes:
+    if not len(todos_lotes):
         print('Nenhum lote encontrado!')
-        return None
+        return None, None
 
-    # Ordenar lotes por número
-    todos_lotes.sort(key=lambda x: int(x['nu_lote']))
+    # Sem resposta do buscar-leilao, usa o nome presente no cabeçalho dos lotes
+    if not nm_leilao:
+        nm_leilao = todos_lotes.cabecalho.get('nm_leilao') or f'LEILÃO {leilao_id}'
 
-    # Criar documento Word
-    doc = Document()
-    
-    # Configurar margens (2.5cm em todas as bordas)
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Cm(2.5)
-        section.bottom_margin = Cm(2.5)
-        section.left_margin = Cm(2.5)
-        section.right_margin = Cm(2.5)
+    # Ordenar lotes por número (o OrdenadorExterno já entrega em ordem)
+    if destino is None:
+        indice_lotes.ordenar_lotes(todos_lotes)
 
-    # Criar cabeçalho e tabela
-    criar_cabecalho(doc, nm_leilao)
-    criar_tabela_lotes(doc, todos_lotes)
+    return todos_lotes, nm_leilao
 
-    # Adicionar data e hora no rodapé
-    footer = doc.sections[0].footer
-    footer_para = footer.paragraphs[0]
-    footer_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    now = datetime.now()
-    footer_para.text = f'Gerado em: {now.strftime("%d/%m/%Y %H:%M:%S")}'
+def gerar_relatorio(todos_lotes, nm_leilao, prefixo, lotes_por_volume=None, processos=None,
+                    compactar=False):
+    """
+    Gera o relatório Word (prefixo + '.docx') ou, com lotes_por_volume, os
+    volumes com esse prefixo. Retorna os arquivos gerados.
+    """
+    if lotes_por_volume:
+        arquivos = volumes_word.gerar_volumes(
+            gerar_documento, todos_lotes, nm_leilao, prefixo,
+            lotes_por_volume, processos, compactar
+        )
+    else:
+        arquivos = [f'{prefixo}.docx']
+        gerar_documento(todos_lotes, nm_leilao, arquivos[0])
+    for output_file in arquivos:
+        print(f'Relatório Word gerado: {output_file}')
+    return arquivos
 
-    # Salvar documento
-    output_file = f'relatorio_leilao_{leilao_id}.docx'
-    doc.save(output_file)
-    print(f'Relatório Word gerado: {output_file}')
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
 
-    return todos_lotes
+    parser = argparse.ArgumentParser(description='Gerador de relatório Word de leilões',
+                                     epilog='Exemplo: python %(prog)s 15324 --volume 500 --zip')
+    parser.add_argument('leilao_id', help='ID do leilão para buscar os lotes')
+    parser.add_argument('--volume', type=int, metavar='N',
+                        help='Divide o relatório em volumes de N lotes gerados em paralelo')
+    parser.add_argument('--processos', type=int,
+                        help='Quantidade de processos usados para gerar os volumes (padrão: nº de CPUs)')
+    parser.add_argument('--zip', action='store_true',
+                        help='Agrupa os volumes em um único arquivo .zip')
+    parser.add_argument('--limite-memoria', type=float, metavar='MB',
+                        help='Ordena os lotes usando disco acima de MB megabytes (requer --volume)')
+    perfil_cpu.adicionar_argumentos(parser)
+    args = parser.parse_args()
 
-if __name__ == '__main__':
-    import sys
-    
-    if len(sys.argv) != 2:
-        print('Uso: python main_word.py <id_leilao>')
-        print('\nExemplo:')
-        print('  python main_word.py 15324')
-        sys.exit(1)
-    
-    leilao_id = sys.argv[1]
-    fazer_requisicao(leilao_id)
+    if args.volume is not None and args.volume <= 0:
+        parser.error('--volume deve ser maior que zero')
+    if args.processos is not None and args.processos < 1:
+        parser.error('--processos deve ser maior que zero')
+    if args.zip and not args.volume:
+        parser.error('--zip requer --volume')
+    if args.limite_memoria is not None and args.limite_memoria <= 0:
+        parser.error('--limite-memoria deve ser maior que zero')
+    if args.limite_memoria and not args.volume:
+        parser.error('--limite-memoria requer --volume')
+
+    with perfil_cpu.perfilar(args, globals()):
+        todos_lotes = fazer_requisicao(args.leilao_id, args.volume, args.processos, args.zip,
+                                       args.limite_memoria)
+        if isinstance(todos_lotes, ordenacao_externa.OrdenadorExterno):
+            todos_lotes.fechar()
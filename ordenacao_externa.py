@@ -0,0 +1,122 @@
+"""
+Ordenação externa dos lotes com limite de memória.
+
+Para leilões (ou execuções consolidadas) maiores que a memória disponível, os
+lotes são acumulados serializados até atingir o limite configurado; então o
+bloco é ordenado por ``nu_lote`` e gravado em um arquivo temporário (uma
+"corrida" ordenada). Na leitura, as corridas são intercaladas (k-way merge com
+heap), entregando os lotes em ordem sem carregar todos em memória. Lotes com
+a mesma chave saem na ordem em que foram acrescentados, como na ordenação em
+memória (indice_lotes.ordenar_lotes).
+
+O OrdenadorExterno pode ser usado como destino de ingestao.projetar_lotes no
+lugar de uma LotesLeilao: possui ``extend``, ``cabecalho`` e ``len``.
+
+Exemplo de uso:
+    with OrdenadorExterno(limite_bytes=64 * 1024 * 1024) as lotes:
+        ingestao.projetar_lotes(resposta, campos, lotes)
+        for lote in lotes:
+            ...
+"""
+
+import heapq
+import json
+import logging
+import os
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import indice_lotes
+
+
+def _chave_nu_lote(lote: Dict) -> Tuple:
+    return indice_lotes.chave_natural(lote.get("nu_lote"))
+
+
+class OrdenadorExterno:
+    """
+    Acumula lotes e os entrega ordenados, usando disco quando o volume
+    serializado em memória passa de ``limite_bytes``.
+    """
+
+    def __init__(self, limite_bytes: int, chave: Callable[[Dict], Tuple] = _chave_nu_lote,
+                 diretorio: Optional[str] = None):
+        if limite_bytes <= 0:
+            raise ValueError("O limite de memória deve ser maior que zero")
+        self.limite_bytes = limite_bytes
+        self.chave = chave
+        self.diretorio = diretorio
+        self.cabecalho: Dict = {}
+        self._buffer: List[Tuple[Tuple, int, str]] = []
+        self._bytes_buffer = 0
+        self._corridas: List[str] = []
+        self._total = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def __len__(self) -> int:
+        return self._total
+
+    def adicionar(self, lote: Dict) -> None:
+        """Acrescenta um lote, gravando uma corrida em disco se o limite for atingido"""
+        linha = json.dumps(lote, ensure_ascii=False)
+        # A posição de chegada desempata lotes com a mesma chave
+        self._buffer.append((self.chave(lote), self._total, linha))
+        self._bytes_buffer += len(linha)
+        self._total += 1
+        if self._bytes_buffer >= self.limite_bytes:
+            self._gravar_corrida()
+
+    def extend(self, lotes: Iterable[Dict]) -> None:
+        for lote in lotes:
+            self.adicionar(lote)
+
+    def _gravar_corrida(self) -> None:
+        if not self._buffer:
+            return
+        self._buffer.sort(key=lambda item: item[:2])
+        descritor, caminho = tempfile.mkstemp(prefix="lotes_", suffix=".jsonl", dir=self.diretorio)
+        with os.fdopen(descritor, "w", encoding="utf-8") as f:
+            for _, posicao, linha in self._buffer:
+                f.write(f"{posicao}\t{linha}\n")
+        self._corridas.append(caminho)
+        logging.debug(f"Corrida {len(self._corridas)} gravada em {caminho} ({len(self._buffer)} lotes)")
+        self._buffer = []
+        self._bytes_buffer = 0
+
+    def _ler_corrida(self, caminho: str) -> Iterator[Tuple[Tuple, int, Dict]]:
+        with open(caminho, encoding="utf-8") as f:
+            for linha in f:
+                posicao, dados = linha.split("\t", 1)
+                lote = json.loads(dados)
+                yield self.chave(lote), int(posicao), lote
+
+    def __iter__(self) -> Iterator[Dict]:
+        """
+        Entrega os lotes ordenados. Pode ser chamado mais de uma vez; lotes
+        acrescentados depois da primeira leitura também são considerados.
+        """
+        if not self._corridas:
+            self._buffer.sort(key=lambda item: item[:2])
+            return (json.loads(linha) for _, _, linha in self._buffer)
+
+        self._gravar_corrida()
+        logging.info(f"Intercalando {len(self._corridas)} corridas ordenadas ({self._total} lotes)")
+        intercalados = heapq.merge(*(self._ler_corrida(c) for c in self._corridas), key=lambda item: item[:2])
+        return (lote for _, _, lote in intercalados)
+
+    def fechar(self) -> None:
+        """Remove os arquivos temporários"""
+        for caminho in self._corridas:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+        self._corridas = []
+        self._buffer = []
+        self._bytes_buffer = 0
+        self._total = 0
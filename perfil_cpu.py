@@ -0,0 +1,214 @@
+"""
+Perfil de CPU dos scripts de relatório.
+
+Com ``--profile`` o script é executado sob o cProfile e, ao final, são gravados:
+- ``<prefixo>.pstats``: estatísticas do cProfile (abrir com ``python -m pstats``
+  ou snakeviz)
+- ``<prefixo>.folded``: pilhas amostradas no formato "collapsed stacks"
+  (``func (modulo:linha);...;func (modulo:linha) amostras``), aceito por
+  flamegraph.pl, speedscope e inferno
+
+e as N funções com maior tempo próprio são exibidas no stderr.
+
+Com ``--profile-funcao`` apenas as chamadas de uma função do script são
+perfiladas (por exemplo ``processar_lotes``, ``gerar_relatorio`` ou
+``criar_tabela_lotes``); chamadas repetidas se acumulam no mesmo perfil. A
+função é substituída pelo nome no globals() do script enquanto ele executa,
+então só são perfiladas as chamadas que procuram o nome no script nesse
+momento. Referências obtidas antes (funções guardadas em variáveis ou
+importadas por outros módulos) e chamadas em outros processos não passam pelo
+perfil. Se a função não for chamada na thread principal, é emitido um aviso
+e apenas o .folded (vazio) e o .pstats sem chamadas são gravados.
+
+Somente a thread principal do processo é perfilada: volumes Word gerados em
+outros processos (``--volume``) e buscas feitas em threads auxiliares não
+aparecem no perfil.
+
+Exemplo de uso:
+    python main.py 15324 --profile
+    python main_word.py 15324 --profile --profile-funcao criar_tabela_lotes --profile-top 30
+"""
+
+import argparse
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+INTERVALO_AMOSTRAGEM = 0.005
+TOP_PADRAO = 20
+
+
+def adicionar_argumentos(parser: argparse.ArgumentParser) -> None:
+    """Acrescenta as opções de perfil de CPU ao parser do script"""
+    grupo = parser.add_argument_group("perfil de CPU")
+    grupo.add_argument("--profile", action="store_true",
+                       help="Executa sob o cProfile e grava .pstats e .folded (flamegraph)")
+    grupo.add_argument("--profile-saida", metavar="PREFIXO",
+                       help="Prefixo dos arquivos de perfil (padrão: perfil_<script>_<data>)")
+    grupo.add_argument("--profile-funcao", metavar="FUNCAO",
+                       help="Perfila apenas as chamadas desta função do script")
+    grupo.add_argument("--profile-top", type=int, default=TOP_PADRAO, metavar="N",
+                       help=f"Quantidade de funções exibidas (padrão: {TOP_PADRAO})")
+
+
+class _AmostradorPilhas(threading.Thread):
+    """Amostra periodicamente a pilha de uma thread e conta as pilhas iguais"""
+
+    def __init__(self, id_thread: int, intervalo: float = INTERVALO_AMOSTRAGEM):
+        super().__init__(daemon=True)
+        self.id_thread = id_thread
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.ativo = False
+        self._parar = threading.Event()
+
+    @staticmethod
+    def _rotulo(frame) -> str:
+        codigo = frame.f_code
+        modulo = frame.f_globals.get("__name__", os.path.basename(codigo.co_filename))
+        return f"{codigo.co_name} ({modulo}:{codigo.co_firstlineno})"
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            if not self.ativo:
+                continue
+            frame = sys._current_frames().get(self.id_thread)
+            pilha = []
+            while frame is not None:
+                if frame.f_code.co_filename != __file__:
+                    pilha.append(self._rotulo(frame))
+                frame = frame.f_back
+            if pilha:
+                self.pilhas[";".join(reversed(pilha))] += 1
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+
+
+class PerfiladorCPU:
+    """
+    Combina o cProfile (tempos por função) com a amostragem de pilhas
+    (flamegraph). Pode ser ligado e desligado várias vezes; os resultados
+    se acumulam.
+
+    Uso:
+        perfilador = PerfiladorCPU()
+        with perfilador:
+            gerar_relatorio(lotes)
+        perfilador.salvar("perfil_15324")
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_AMOSTRAGEM):
+        self.perfil = cProfile.Profile()
+        self.id_thread = threading.get_ident()
+        self.amostrador = _AmostradorPilhas(self.id_thread, intervalo)
+        self.amostrador.start()
+        self.segundos = 0.0
+        self._profundidade = 0
+        self._inicio = 0.0
+
+    def __enter__(self):
+        self._profundidade += 1
+        if self._profundidade == 1:
+            self._inicio = time.perf_counter()
+            self.amostrador.ativo = True
+            self.perfil.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._profundidade -= 1
+        if self._profundidade == 0:
+            self.perfil.disable()
+            self.amostrador.ativo = False
+            self.segundos += time.perf_counter() - self._inicio
+
+    def envolver(self, funcao: Callable) -> Callable:
+        """Retorna a função perfilada quando chamada pela thread do perfilador"""
+        @functools.wraps(funcao)
+        def perfilada(*args, **kwargs):
+            if threading.get_ident() != self.id_thread:
+                return funcao(*args, **kwargs)
+            with self:
+                return funcao(*args, **kwargs)
+        return perfilada
+
+    def salvar(self, prefixo: str) -> Dict[str, str]:
+        """Grava o .pstats e o .folded; retorna os caminhos gerados"""
+        self.amostrador.parar()
+        arquivos = {"pstats": f"{prefixo}.pstats", "folded": f"{prefixo}.folded"}
+        self.perfil.dump_stats(arquivos["pstats"])
+        with open(arquivos["folded"], "w", encoding="utf-8") as f:
+            for pilha, amostras in self.amostrador.pilhas.most_common():
+                f.write(f"{pilha} {amostras}\n")
+        return arquivos
+
+    def imprimir(self, top: int = TOP_PADRAO, fluxo=None) -> None:
+        """Exibe as funções com maior tempo próprio"""
+        fluxo = fluxo or sys.stderr
+        print("=" * 50, file=fluxo)
+        print(f"PERFIL DE CPU ({self.segundos:.3f} s perfilados, "
+              f"{sum(self.amostrador.pilhas.values())} amostras de pilha)", file=fluxo)
+        print("=" * 50, file=fluxo)
+        if not self.perfil.getstats():
+            # pstats.Stats recusa um perfil vazio ("no stats")
+            print("Nenhuma chamada perfilada", file=fluxo)
+            return
+        estatisticas = pstats.Stats(self.perfil, stream=fluxo)
+        estatisticas.strip_dirs().sort_stats("tottime").print_stats(top)
+
+
+def _prefixo_padrao() -> str:
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+    return f"perfil_{script}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+@contextmanager
+def perfilar(args: argparse.Namespace, escopo: Dict):
+    """
+    Executa o bloco sob o perfil de CPU conforme as opções de
+    adicionar_argumentos; sem ``--profile`` não faz nada.
+
+    Args:
+        args (argparse.Namespace): Argumentos do script
+        escopo (Dict): globals() do script, onde a função de
+            ``--profile-funcao`` é procurada e substituída durante o bloco;
+            apenas chamadas feitas pelo nome no script, na thread principal,
+            são perfiladas
+    """
+    if not getattr(args, "profile", False):
+        yield
+        return
+
+    nome_funcao: Optional[str] = args.profile_funcao
+    original = escopo.get(nome_funcao) if nome_funcao else None
+    if nome_funcao and not callable(original):
+        raise SystemExit(f"--profile-funcao: função {nome_funcao!r} não encontrada no script")
+
+    perfilador = PerfiladorCPU()
+    try:
+        if nome_funcao:
+            escopo[nome_funcao] = perfilador.envolver(original)
+            try:
+                yield
+            finally:
+                escopo[nome_funcao] = original
+        else:
+            with perfilador:
+                yield
+    finally:
+        arquivos = perfilador.salvar(args.profile_saida or _prefixo_padrao())
+        if nome_funcao and not perfilador.perfil.getstats():
+            logging.warning(f"--profile-funcao: {nome_funcao} não foi chamada pelo nome na thread "
+                            f"principal do script; o perfil está vazio")
+        perfilador.imprimir(args.profile_top)
+        print(f"Perfil gravado em {arquivos['pstats']} e {arquivos['folded']}", file=sys.stderr)
@@ -0,0 +1,347 @@
+"""
+Perfil de memória do pipeline de relatório por etapa.
+
+Executa o pipeline de um leilão dividido nas etapas fetch (download das
+respostas), parse (JSON), transform (projeção e ordenação dos lotes) e render
+(geração do Excel ou do Word), registrando para cada etapa:
+- pico de memória alocada pelo Python (tracemalloc) acima do início da etapa
+- pico de RSS do processo durante a etapa, acima do RSS do início da etapa
+- principais pontos de alocação no maior ponto marcado da etapa (por exemplo,
+  logo antes de gravar o relatório) ou, sem marcação, ao final da etapa
+
+Orçamentos de memória por etapa podem ser informados; se algum for excedido
+o script termina com código 1, permitindo usá-lo como benchmark em CI.
+
+Exemplo de uso:
+    python perfil_memoria.py 15324 --relatorio word --orcamento render=300 --orcamento parse=50
+    python perfil_memoria.py 15324 --arquivo-lotes lotes_15324.json --orcamento-rss render=500
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ETAPAS = ("fetch", "parse", "transform", "render")
+MB = 1024 * 1024
+
+# Alocações do próprio medidor não entram na lista de principais alocações
+_FILTROS_MEDIDOR = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, threading.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def rss_atual() -> int:
+    """Retorna o RSS atual do processo em bytes"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        # Sem /proc (macOS): usa o pico do processo
+        import resource
+    except ImportError:
+        # Windows sem psutil: RSS indisponível
+        return 0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+class _AmostradorRSS(threading.Thread):
+    """Amostra o RSS em segundo plano e guarda o maior valor observado"""
+
+    def __init__(self, intervalo: float = 0.01):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.inicio = rss_atual()
+        self.pico = self.inicio
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, rss_atual())
+
+    def parar(self) -> int:
+        self._parar.set()
+        self.join()
+        self.pico = max(self.pico, rss_atual())
+        return self.pico
+
+
+class MedidorMemoria:
+    """
+    Mede o uso de memória de etapas nomeadas.
+
+    Uso:
+        medidor = MedidorMemoria()
+        with medidor.etapa("parse"):
+            lotes = json.loads(conteudo)
+        medidor.imprimir()
+
+    Dentro de uma etapa, marcar_pico() registra as alocações do momento
+    (por exemplo, com o documento montado e ainda não gravado); as
+    principais alocações da etapa vêm da marcação com mais memória alocada.
+    """
+
+    def __init__(self, top: int = 10, quadros: int = 5):
+        self.top = top
+        self.resultados: List[Dict] = []
+        self._pico_marcado: Optional[Tuple[int, tracemalloc.Snapshot]] = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(quadros)
+
+    def marcar_pico(self) -> None:
+        """Registra as alocações atuais se forem maiores que as da última marcação da etapa"""
+        atual, _ = tracemalloc.get_traced_memory()
+        if self._pico_marcado is None or atual > self._pico_marcado[0]:
+            self._pico_marcado = (atual, tracemalloc.take_snapshot().filter_traces(_FILTROS_MEDIDOR))
+
+    @contextmanager
+    def etapa(self, nome: str):
+        snapshot_inicio = tracemalloc.take_snapshot().filter_traces(_FILTROS_MEDIDOR)
+        inicio_alocado, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._pico_marcado = None
+        amostrador = _AmostradorRSS()
+        amostrador.start()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            delta_rss = amostrador.parar() - amostrador.inicio
+            fim_alocado, pico_alocado = tracemalloc.get_traced_memory()
+            if self._pico_marcado is not None:
+                alocacoes_em = "pico"
+                snapshot = self._pico_marcado[1]
+                self._pico_marcado = None
+            else:
+                alocacoes_em = "fim"
+                snapshot = tracemalloc.take_snapshot().filter_traces(_FILTROS_MEDIDOR)
+
+            estatisticas = snapshot.compare_to(snapshot_inicio, "traceback")
+            principais = [
+                {
+                    "local": "; ".join(f"{q.filename}:{q.lineno}" for q in reversed(e.traceback)),
+                    "bytes": e.size_diff,
+                    "blocos": e.count_diff,
+                }
+                for e in estatisticas[:self.top]
+                if e.size_diff > 0
+            ]
+
+            self.resultados.append({
+                "etapa": nome,
+                "segundos": round(duracao, 3),
+                "pico_python_mb": round((pico_alocado - inicio_alocado) / MB, 2),
+                "retido_python_mb": round((fim_alocado - inicio_alocado) / MB, 2),
+                "rss_inicio_mb": round(amostrador.inicio / MB, 2),
+                "delta_rss_mb": round(delta_rss / MB, 2),
+                "alocacoes_em": alocacoes_em,
+                "principais_alocacoes": principais,
+            })
+
+    def verificar_orcamentos(self, orcamentos: Dict[str, float],
+                             orcamentos_rss: Optional[Dict[str, float]] = None) -> List[str]:
+        """Retorna as mensagens de violação dos orçamentos (em MB) informados"""
+        violacoes = []
+        for resultado in self.resultados:
+            etapa = resultado["etapa"]
+            limite = orcamentos.get(etapa)
+            if limite is not None and resultado["pico_python_mb"] > limite:
+                violacoes.append(
+                    f"{etapa}: pico Python de {resultado['pico_python_mb']} MB excede o orçamento de {limite} MB"
+                )
+            limite = (orcamentos_rss or {}).get(etapa)
+            if limite is not None and resultado["delta_rss_mb"] > limite:
+                violacoes.append(
+                    f"{etapa}: aumento de RSS de {resultado['delta_rss_mb']} MB excede o orçamento de {limite} MB"
+                )
+        return violacoes
+
+    def imprimir(self) -> None:
+        """Imprime o resumo de memória de cada etapa"""
+        print("=" * 50)
+        print("PERFIL DE MEMÓRIA POR ETAPA")
+        print("=" * 50)
+        for resultado in self.resultados:
+            print(f"\n{resultado['etapa']} ({resultado['segundos']} s):")
+            print(f"- Pico Python: {resultado['pico_python_mb']} MB")
+            print(f"- Retido Python: {resultado['retido_python_mb']} MB")
+            print(f"- Pico RSS acima do início: {resultado['delta_rss_mb']} MB "
+                  f"(início: {resultado['rss_inicio_mb']} MB)")
+            if resultado["principais_alocacoes"]:
+                momento = "no pico" if resultado["alocacoes_em"] == "pico" else "retidas ao final"
+                print(f"- Principais alocações {momento}:")
+                for alocacao in resultado["principais_alocacoes"]:
+                    print(f"    {alocacao['bytes'] / 1024:,.1f} KiB em {alocacao['blocos']} blocos - {alocacao['local']}")
+
+
+def _ler_orcamentos(valores: List[str]) -> Dict[str, float]:
+    """Converte argumentos no formato etapa=MB em um dicionário"""
+    orcamentos = {}
+    for valor in valores or []:
+        etapa, _, limite = valor.partition("=")
+        if etapa not in ETAPAS or not limite:
+            raise argparse.ArgumentTypeError(f"Orçamento inválido: {valor!r} (use etapa=MB, etapas: {', '.join(ETAPAS)})")
+        try:
+            orcamentos[etapa] = float(limite)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Orçamento inválido: {valor!r} (MB deve ser um número)")
+    return orcamentos
+
+
+@contextmanager
+def _marcar_pico_ao_gravar(medidor: MedidorMemoria, classe):
+    """Marca o pico de memória sempre que classe.save for chamado"""
+    save = classe.save
+
+    def save_medido(self, *args, **kwargs):
+        medidor.marcar_pico()
+        return save(self, *args, **kwargs)
+
+    classe.save = save_medido
+    try:
+        yield
+    finally:
+        classe.save = save
+
+
+def executar_pipeline(medidor: MedidorMemoria, leilao_id: str, relatorio: str,
+                      ambiente: str = "prod", arquivo_lotes: Optional[str] = None) -> None:
+    """
+    Executa o pipeline de relatório medindo cada etapa.
+
+    Com ``arquivo_lotes`` a etapa fetch lê os lotes gravados em um arquivo JSON
+    em vez de consultar a API.
+
+    Os módulos usados em todas as etapas (renderizadores, pandas, python-docx)
+    são importados antes da primeira etapa, para que o custo único de
+    importação não seja atribuído a nenhuma delas.
+    """
+    # pandas e openpyxl são importados pelo relatório Excel (o pandas carrega
+    # o openpyxl e a formatação de Excel só ao gravar); a importação fica fora das etapas
+    import openpyxl
+    import pandas
+    import pandas.io.formats.excel
+    import api_leiloes
+    import indice_lotes
+    import ingestao
+    import transporte
+
+    if relatorio == "word":
+        import main_word as renderizador
+        campos = renderizador.CAMPOS_RELATORIO_WORD
+    else:
+        import main as renderizador
+        campos = renderizador.CAMPOS_RELATORIO_EXCEL
+
+    with medidor.etapa("fetch"):
+        if arquivo_lotes:
+            with open(arquivo_lotes, "rb") as f:
+                conteudos = [f.read()]
+        else:
+            if ambiente == "prod":
+                from config import API_CONFIG
+                url = API_CONFIG["url_prod"]
+                url_leiloeiro = api_leiloes.URL_LEILOEIRO_PROD
+            else:
+                from config2 import API_CONFIG
+                url = API_CONFIG["url_test"]
+                url_leiloeiro = api_leiloes.URL_LEILOEIRO_TESTE
+            transporte.configurar_transporte(verify=False)
+            conteudos = []
+            for nm_vendidos in ("S", "N"):
+                response = transporte.post(url, data={
+                    "url_leiloeiro": url_leiloeiro,
+                    "leilao_id": str(leilao_id),
+                    "nm_vendidos": nm_vendidos
+                }, headers=API_CONFIG["headers"])
+                response.raise_for_status()
+                conteudos.append(response.content)
+
+    with medidor.etapa("parse"):
+        respostas = [json.loads(conteudo) for conteudo in conteudos]
+        del conteudos
+
+    with medidor.etapa("transform"):
+        lotes = ingestao.LotesLeilao()
+        for resposta in respostas:
+            ingestao.projetar_lotes(resposta, campos, lotes)
+        del respostas
+        indice_lotes.ordenar_lotes(lotes)
+
+    # O pico da etapa render é o documento montado, logo antes de gravá-lo;
+    # depois de gravado ele é liberado e não aparece ao final da etapa
+    if relatorio == "word":
+        import docx.document
+        classe_gravacao = docx.document.Document
+    else:
+        classe_gravacao = openpyxl.Workbook
+
+    with medidor.etapa("render"), _marcar_pico_ao_gravar(medidor, classe_gravacao):
+        if relatorio == "word":
+            nm_leilao = lotes.cabecalho.get("nm_leilao") or f"LEILÃO {leilao_id}"
+            renderizador.gerar_documento(lotes, nm_leilao, f"relatorio_leilao_{leilao_id}.docx")
+        else:
+            renderizador.gerar_relatorio(lotes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfil de memória do pipeline de relatório de leilões")
+    parser.add_argument("leilao_id", help="ID do leilão")
+    parser.add_argument("--relatorio", choices=["excel", "word"], default="word",
+                        help="Relatório gerado na etapa render")
+    parser.add_argument("--ambiente", choices=["prod", "teste"], default="prod",
+                        help="Ambiente da API consultado na etapa fetch")
+    parser.add_argument("--arquivo-lotes", help="Arquivo JSON com os lotes, usado no lugar da API")
+    parser.add_argument("--orcamento", action="append", metavar="ETAPA=MB",
+                        help="Pico máximo de memória Python da etapa (pode repetir)")
+    parser.add_argument("--orcamento-rss", action="append", metavar="ETAPA=MB",
+                        help="Aumento máximo do RSS do processo na etapa (pode repetir)")
+    parser.add_argument("--top", type=int, default=10, help="Quantidade de pontos de alocação por etapa")
+    parser.add_argument("--json", dest="arquivo_json", help="Salva o resultado em JSON")
+    args = parser.parse_args()
+
+    try:
+        orcamentos = _ler_orcamentos(args.orcamento)
+        orcamentos_rss = _ler_orcamentos(args.orcamento_rss)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    medidor = MedidorMemoria(top=args.top)
+    try:
+        executar_pipeline(medidor, args.leilao_id, args.relatorio, args.ambiente, args.arquivo_lotes)
+    except Exception as e:
+        logging.error(f"Erro ao executar o pipeline: {e}")
+        medidor.imprimir()
+        sys.exit(2)
+
+    medidor.imprimir()
+
+    violacoes = medidor.verificar_orcamentos(orcamentos, orcamentos_rss)
+    if args.arquivo_json:
+        with open(args.arquivo_json, "w", encoding="utf-8") as f:
+            json.dump({"etapas": medidor.resultados, "violacoes": violacoes}, f, ensure_ascii=False, indent=2)
+
+    if violacoes:
+        print("\nORÇAMENTOS EXCEDIDOS:")
+        for violacao in violacoes:
+            print(f"- {violacao}")
+        sys.exit(1)
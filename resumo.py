@@ -0,0 +1,90 @@
+"""
+Quadro resumo do leilão calculado de forma incremental.
+
+O QuadroResumo acumula as contagens e o valor arrematado à medida que os lotes
+são processados, sem precisar da lista completa de lotes. Lotes podem ser
+removidos (por exemplo, quando o status de um lote muda durante o leilão) e
+os totais são atualizados sem recalcular os demais.
+"""
+
+from typing import Dict, List
+
+
+def formatar_moeda(valor: float) -> str:
+    """Formata um valor no padrão de moeda brasileira (R$ 1.234,56)"""
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+class QuadroResumo:
+    """Totais do QUADRO RESUMO do relatório"""
+
+    ROTULOS = [
+        "TOTAL DE LOTES",
+        "TOTAL DE LOTES ARREMATADOS",
+        "PERCENTUAL DE LOTES ARREMATADOS",
+        "TOTAL DE LOTES NÃO ARREMATADOS",
+        "PERCENTUAL DE LOTES NÃO ARREMATADOS",
+        "VALOR TOTAL ARREMATADO",
+    ]
+
+    def __init__(self):
+        self.total_arrematados = 0
+        self.total_nao_arrematados = 0
+        self.valor_total_arrematado = 0.0
+
+    def adicionar(self, is_vendido: bool, valor_arrematado: float = 0.0) -> None:
+        """Contabiliza um lote"""
+        if is_vendido:
+            self.total_arrematados += 1
+            self.valor_total_arrematado += valor_arrematado
+        else:
+            self.total_nao_arrematados += 1
+
+    def remover(self, is_vendido: bool, valor_arrematado: float = 0.0) -> None:
+        """Desfaz a contabilização de um lote"""
+        if is_vendido:
+            self.total_arrematados -= 1
+            self.valor_total_arrematado -= valor_arrematado
+        else:
+            self.total_nao_arrematados -= 1
+
+    @property
+    def total_lotes(self) -> int:
+        return self.total_arrematados + self.total_nao_arrematados
+
+    @property
+    def perc_arrematados(self) -> float:
+        return (self.total_arrematados / self.total_lotes * 100) if self.total_lotes > 0 else 0
+
+    @property
+    def perc_nao_arrematados(self) -> float:
+        return (self.total_nao_arrematados / self.total_lotes * 100) if self.total_lotes > 0 else 0
+
+    def valores(self) -> List:
+        """Valores formatados na ordem de ROTULOS, como exibidos no relatório"""
+        return [
+            self.total_lotes,
+            self.total_arrematados,
+            f"{self.perc_arrematados:.2f}%",
+            self.total_nao_arrematados,
+            f"{self.perc_nao_arrematados:.2f}%",
+            formatar_moeda(self.valor_total_arrematado),
+        ]
+
+    def tabela(self) -> Dict[str, List]:
+        """Colunas da planilha de resumo"""
+        return {
+            "QUADRO RESUMO": list(self.ROTULOS),
+            "Quantidade": self.valores(),
+        }
+
+    def como_dict(self) -> Dict:
+        """Totais numéricos, para JSON e planilhas consolidadas"""
+        return {
+            "total_lotes": self.total_lotes,
+            "total_arrematados": self.total_arrematados,
+            "perc_arrematados": round(self.perc_arrematados, 2),
+            "total_nao_arrematados": self.total_nao_arrematados,
+            "perc_nao_arrematados": round(self.perc_nao_arrematados, 2),
+            "valor_total_arrematado": round(self.valor_total_arrematado, 2),
+        }
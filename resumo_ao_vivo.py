@@ -0,0 +1,381 @@
+"""
+Resumo ao vivo de um leilão em andamento.
+
+Um único laço consulta os lotes do leilão a cada intervalo, compara com a
+consulta anterior e atualiza o QUADRO RESUMO de forma incremental (somente os
+lotes adicionados, removidos ou alterados são contabilizados novamente). A
+cada mudança um evento com os lotes alterados e os totais atualizados é
+enviado a todos os inscritos; cada evento é serializado uma única vez,
+independente da quantidade de inscritos.
+
+Endpoints:
+- GET /eventos: Server-Sent Events (``text/event-stream``), para navegadores
+- GET /fluxo: JSON-lines, um evento por linha
+- GET /resumo: totais atuais em JSON
+- GET /estado: totais e todos os lotes em JSON
+
+Ao se inscrever, o cliente recebe primeiro um evento ``estado`` com todos os
+lotes e depois eventos ``atualizacao``; eventos ``erro`` indicam falha na
+consulta (os últimos dados continuam valendo). Lotes que repetem a chave de
+outro lote na mesma consulta não entram no quadro resumo; as chaves repetidas
+aparecem em ``duplicados`` no resumo e são registradas no log.
+
+Exemplo de uso:
+    python resumo_ao_vivo.py 15324 --intervalo 10
+    curl -N http://127.0.0.1:8780/eventos
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+import api_leiloes
+import ingestao
+import transporte
+from diferencas import comparar_indices, indexar_lotes
+from resumo import QuadroResumo
+
+# Campos enviados aos inscritos, além de lote_id e nu_lote
+CAMPOS_AO_VIVO = ("nm_osa", "nm_status", "vl_avaliacao", "vl_minimo", "arrematacao")
+
+INTERVALO_PING = 15
+TAMANHO_FILA = 100
+
+
+def _situacao(lote: Dict) -> Tuple[bool, float]:
+    """Argumentos de QuadroResumo.adicionar/remover para o lote"""
+    return (
+        str(lote.get("nm_status", "")).strip().upper() == "VENDIDO",
+        api_leiloes.valor_arrematado(lote),
+    )
+
+
+def _agora() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class MonitorLeilao:
+    """
+    Mantém os lotes do leilão indexados e o QuadroResumo, atualizados pela
+    diferença entre consultas. Se a chave se repetir na consulta, apenas o
+    primeiro lote com ela é considerado e a chave fica em ``duplicados``.
+    """
+
+    def __init__(self, leilao_id: str, chave: str = "lote_id"):
+        self.leilao_id = str(leilao_id)
+        self.chave = chave
+        self.indice: Dict[str, Dict] = {}
+        self.quadro = QuadroResumo()
+        self.cabecalho: Dict = {}
+        self.duplicados: Dict[str, int] = {}
+        self.sequencia = 0
+
+    def resumo(self) -> Dict:
+        """Totais atuais do quadro resumo"""
+        return {
+            "nm_leilao": self.cabecalho.get("nm_leilao"),
+            **self.quadro.como_dict(),
+            "duplicados": self.duplicados,
+        }
+
+    def estado(self) -> Dict:
+        """Evento com todos os lotes, enviado a quem acabou de se inscrever"""
+        return {
+            "tipo": "estado",
+            "sequencia": self.sequencia,
+            "leilao_id": self.leilao_id,
+            "momento": _agora(),
+            "lotes": list(self.indice.values()),
+            "resumo": self.resumo(),
+        }
+
+    def atualizar(self, lotes_api: List[Dict]) -> Optional[Dict]:
+        """
+        Aplica uma nova consulta dos lotes. Retorna o evento de atualização,
+        ou None se nenhum lote (nem as chaves repetidas) mudou.
+        """
+        lotes = ingestao.projetar_lotes(lotes_api, CAMPOS_AO_VIVO)
+        self.cabecalho = lotes.cabecalho or self.cabecalho
+        duplicados: Dict[str, int] = {}
+        atual = indexar_lotes(lotes, self.chave, duplicados)
+        adicionados, removidos, alterados = comparar_indices(self.indice, atual)
+        mudou_duplicados = duplicados != self.duplicados
+        if mudou_duplicados and duplicados:
+            logging.warning(
+                f"Leilão {self.leilao_id}: {len(duplicados)} valores de {self.chave} repetidos na consulta "
+                f"(somente o primeiro lote de cada um entra no resumo): "
+                + ", ".join(f"{k} ({n}x)" for k, n in list(duplicados.items())[:10])
+            )
+        self.duplicados = duplicados
+        if not (adicionados or removidos or alterados or mudou_duplicados):
+            return None
+
+        for k in removidos:
+            self.quadro.remover(*_situacao(self.indice[k]))
+        for k in alterados:
+            self.quadro.remover(*_situacao(self.indice[k]))
+            self.quadro.adicionar(*_situacao(atual[k]))
+        for k in adicionados:
+            self.quadro.adicionar(*_situacao(atual[k]))
+
+        self.indice = atual
+        self.sequencia += 1
+        return {
+            "tipo": "atualizacao",
+            "sequencia": self.sequencia,
+            "leilao_id": self.leilao_id,
+            "momento": _agora(),
+            "adicionados": [atual[k] for k in adicionados],
+            "alterados": [atual[k] for k in alterados],
+            "diferencas": alterados,
+            "removidos": removidos,
+            "resumo": self.resumo(),
+        }
+
+
+class Difusor:
+    """Entrega eventos já serializados às filas dos inscritos"""
+
+    def __init__(self, tamanho_fila: int = TAMANHO_FILA):
+        self.tamanho_fila = tamanho_fila
+        self._filas: List[queue.Queue] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._filas)
+
+    def inscrever(self) -> queue.Queue:
+        fila = queue.Queue(self.tamanho_fila)
+        with self._lock:
+            self._filas.append(fila)
+        return fila
+
+    def cancelar(self, fila: queue.Queue) -> None:
+        with self._lock:
+            if fila in self._filas:
+                self._filas.remove(fila)
+
+    def publicar(self, evento: Dict) -> None:
+        """
+        Serializa o evento uma vez e o coloca na fila de cada inscrito. Um
+        inscrito com a fila cheia é desconectado (recebe None) para não
+        atrasar os demais; ao reconectar ele recebe o estado completo.
+        """
+        mensagem = (evento["tipo"], evento.get("sequencia"), json.dumps(evento, ensure_ascii=False))
+        with self._lock:
+            filas = list(self._filas)
+        for fila in filas:
+            try:
+                fila.put_nowait(mensagem)
+            except queue.Full:
+                logging.warning("Inscrito lento desconectado do resumo ao vivo")
+                self.cancelar(fila)
+                with fila.mutex:
+                    fila.queue.clear()
+                fila.put_nowait(None)
+
+
+class ResumoAoVivo:
+    """
+    Laço de consulta compartilhado por todos os inscritos.
+
+    Uso:
+        ao_vivo = ResumoAoVivo("15324", buscar, intervalo=10)
+        threading.Thread(target=ao_vivo.executar, daemon=True).start()
+        sequencia, estado, fila = ao_vivo.inscrever()
+    """
+
+    def __init__(self, leilao_id: str, buscar: Callable[[], List[Dict]],
+                 intervalo: float = 10.0, chave: str = "lote_id"):
+        self.monitor = MonitorLeilao(leilao_id, chave)
+        self.difusor = Difusor()
+        self.buscar = buscar
+        self.intervalo = intervalo
+        self.parar = threading.Event()
+        self._lock = threading.Lock()
+        self._estado_serializado: Tuple[int, str] = (-1, "")
+
+    def ciclo(self) -> Optional[Dict]:
+        """Faz uma consulta e publica o evento resultante, se houver"""
+        try:
+            lotes = self.buscar()
+        except Exception as e:
+            logging.warning(f"Erro ao consultar os lotes do leilão {self.monitor.leilao_id}: {e}")
+            evento = {"tipo": "erro", "sequencia": self.monitor.sequencia,
+                      "momento": _agora(), "erro": str(e)}
+            self.difusor.publicar(evento)
+            return evento
+
+        with self._lock:
+            evento = self.monitor.atualizar(lotes)
+            if evento is not None:
+                self.difusor.publicar(evento)
+        if evento is not None:
+            logging.info(
+                f"Atualização {evento['sequencia']}: {len(evento['adicionados'])} adicionados, "
+                f"{len(evento['alterados'])} alterados, {len(evento['removidos'])} removidos - "
+                f"{len(self.difusor)} inscritos"
+            )
+        return evento
+
+    def executar(self) -> None:
+        """Consulta a cada intervalo até ``parar`` ser sinalizado"""
+        while not self.parar.is_set():
+            self.ciclo()
+            self.parar.wait(self.intervalo)
+
+    def _estado(self) -> Tuple[int, str]:
+        # Serializado uma vez por sequência, compartilhado pelos inscritos
+        if self._estado_serializado[0] != self.monitor.sequencia:
+            self._estado_serializado = (
+                self.monitor.sequencia, json.dumps(self.monitor.estado(), ensure_ascii=False)
+            )
+        return self._estado_serializado
+
+    def estado(self) -> Tuple[int, str]:
+        """Sequência e evento de estado atual serializado"""
+        with self._lock:
+            return self._estado()
+
+    def inscrever(self) -> Tuple[int, str, queue.Queue]:
+        """
+        Retorna a sequência e o evento de estado atual (serializado) e a fila
+        dos próximos eventos. A inscrição e o estado são obtidos juntos, sem
+        perder atualizações entre eles.
+        """
+        with self._lock:
+            sequencia, texto = self._estado()
+            return sequencia, texto, self.difusor.inscrever()
+
+    def resumo(self) -> Dict:
+        with self._lock:
+            return {"sequencia": self.monitor.sequencia, "leilao_id": self.monitor.leilao_id,
+                    "resumo": self.monitor.resumo()}
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+
+    def log_message(self, formato, *args):
+        logging.debug(f"{self.address_string()} - {formato % args}")
+
+    def _json(self, dados: Dict, status: int = 200) -> None:
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        ao_vivo: ResumoAoVivo = self.server.ao_vivo
+        caminho = self.path.split("?")[0].rstrip("/")
+        if caminho == "/resumo":
+            self._json(ao_vivo.resumo())
+        elif caminho == "/estado":
+            corpo = ao_vivo.estado()[1].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+        elif caminho in ("/eventos", "/fluxo"):
+            self._transmitir(ao_vivo, sse=caminho == "/eventos")
+        else:
+            self._json({"erro": "use /eventos, /fluxo, /resumo ou /estado"}, 404)
+
+    def _transmitir(self, ao_vivo: ResumoAoVivo, sse: bool) -> None:
+        if sse:
+            formatar = lambda tipo, seq, texto: f"event: {tipo}\nid: {seq}\ndata: {texto}\n\n"
+            ping = ": ping\n\n"
+        else:
+            formatar = lambda tipo, seq, texto: f"{texto}\n"
+            ping = '{"tipo": "ping"}\n'
+
+        sequencia, estado, fila = ao_vivo.inscrever()
+        logging.info(f"Inscrito conectado ({self.address_string()}); {len(ao_vivo.difusor)} inscritos")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream" if sse else "application/x-ndjson")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(formatar("estado", sequencia, estado).encode("utf-8"))
+            self.wfile.flush()
+            while not ao_vivo.parar.is_set():
+                try:
+                    mensagem = fila.get(timeout=INTERVALO_PING)
+                except queue.Empty:
+                    self.wfile.write(ping.encode("utf-8"))
+                else:
+                    if mensagem is None:
+                        break
+                    self.wfile.write(formatar(*mensagem).encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            ao_vivo.difusor.cancelar(fila)
+            logging.info(f"Inscrito desconectado ({self.address_string()})")
+
+
+def criar_servidor(ao_vivo: ResumoAoVivo, host: str = "127.0.0.1", porta: int = 8780) -> ThreadingHTTPServer:
+    """Cria o servidor HTTP dos inscritos (sem iniciá-lo)"""
+    servidor = ThreadingHTTPServer((host, porta), _Manipulador)
+    servidor.daemon_threads = True
+    servidor.ao_vivo = ao_vivo
+    return servidor
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Resumo ao vivo de um leilão (SSE e JSON-lines)")
+    parser.add_argument("leilao_id", help="ID do leilão")
+    parser.add_argument("--ambiente", choices=["prod", "teste"], default="prod")
+    parser.add_argument("--url", help="URL de buscar-lotes usada no lugar da configuração "
+                                      "(por exemplo, a do servidor_simulado.py)")
+    parser.add_argument("--intervalo", type=float, default=10.0, help="Segundos entre consultas (padrão: 10)")
+    parser.add_argument("--chave", choices=["lote_id", "nu_lote"], default="lote_id",
+                        help="Campo que identifica o lote entre consultas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8780)
+    args = parser.parse_args()
+
+    if args.intervalo <= 0:
+        parser.error("--intervalo deve ser maior que zero")
+
+    if args.url:
+        url, headers, url_leiloeiro = args.url, None, api_leiloes.URL_LEILOEIRO_PROD
+    elif args.ambiente == "prod":
+        from config import API_CONFIG
+        url, headers, url_leiloeiro = API_CONFIG["url_prod"], API_CONFIG["headers"], api_leiloes.URL_LEILOEIRO_PROD
+    else:
+        from config2 import API_CONFIG
+        url, headers, url_leiloeiro = API_CONFIG["url_test"], API_CONFIG["headers"], api_leiloes.URL_LEILOEIRO_TESTE
+
+    transporte.configurar_transporte(verify=False)
+
+    ao_vivo = ResumoAoVivo(
+        args.leilao_id,
+        lambda: api_leiloes.buscar_todos_lotes(url, args.leilao_id, headers, url_leiloeiro),
+        args.intervalo, args.chave
+    )
+    servidor = criar_servidor(ao_vivo, args.host, args.porta)
+    host, porta = servidor.server_address[:2]
+    logging.info(f"Resumo ao vivo do leilão {args.leilao_id} em http://{host}:{porta}/eventos "
+                 f"(também /fluxo, /resumo e /estado), consultando a cada {args.intervalo:g} s")
+
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        ao_vivo.executar()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ao_vivo.parar.set()
+        servidor.shutdown()
+        servidor.server_close()
@@ -0,0 +1,144 @@
+"""
+Saída de console dos scripts de relatório com níveis de verbosidade.
+
+Os scripts escrevem pelo módulo em vez de usar print() diretamente:
+- SILENCIOSO: apenas o resumo em JSON, quando solicitado
+- RESUMO: mensagens de andamento e o resumo do leilão (padrão)
+- LOTES: inclui o detalhamento de cada lote
+
+Quando a saída é redirecionada (arquivo, pipe, log do CI), as mensagens são
+acumuladas em memória e escritas em blocos, evitando uma escrita por linha;
+os scripts chamam descarregar() ao fim de cada etapa (busca, processamento,
+geração do relatório) para que o andamento não fique atrás das mensagens de
+log nem se perca se o processo for interrompido. Em um terminal cada linha é
+escrita imediatamente. No formato JSON nenhuma
+mensagem de texto é escrita; ao final da execução é emitido um único objeto
+JSON com o resumo.
+
+Exemplo de uso:
+    import saida
+
+    saida.configurar_saida(nivel=saida.RESUMO)
+    saida.escrever("Buscando lotes vendidos...")
+    if saida.ativo(saida.LOTES):
+        saida.escrever(f"Lote {lote['nu_lote']}", saida.LOTES)
+    saida.resumo({"total_lotes": 10}, ["Total de lotes: 10"])
+"""
+
+import atexit
+import json
+import sys
+from typing import Dict, List, Optional, TextIO
+
+SILENCIOSO = 0
+RESUMO = 1
+LOTES = 2
+
+NIVEIS = {
+    "silencioso": SILENCIOSO,
+    "resumo": RESUMO,
+    "lotes": LOTES,
+}
+
+_config = {
+    "nivel": RESUMO,
+    "formato": "texto",
+    "fluxo": None,
+    "tamanho_buffer": 64 * 1024,
+}
+
+_buffer: List[str] = []
+_tamanho = 0
+_interativo: Optional[bool] = None
+_resumo: Dict = {}
+
+
+def configurar_saida(**opcoes) -> None:
+    """
+    Ajusta a saída. Opções aceitas: nivel (int ou nome em NIVEIS),
+    formato ("texto" ou "json"), fluxo (arquivo de texto, padrão sys.stdout)
+    e tamanho_buffer (em caracteres).
+    """
+    desconhecidas = set(opcoes) - set(_config)
+    if desconhecidas:
+        raise ValueError(f"Opções de saída desconhecidas: {sorted(desconhecidas)}")
+
+    nivel = opcoes.get("nivel")
+    if isinstance(nivel, str):
+        opcoes["nivel"] = NIVEIS[nivel]
+    if opcoes.get("formato", "texto") not in ("texto", "json"):
+        raise ValueError(f"Formato de saída inválido: {opcoes['formato']}")
+
+    global _interativo
+
+    descarregar()
+    _config.update(opcoes)
+    _interativo = None
+
+
+def _fluxo() -> TextIO:
+    return _config["fluxo"] or sys.stdout
+
+
+def _terminal() -> bool:
+    """Indica se o fluxo de saída é um terminal (escrita linha a linha)"""
+    global _interativo
+
+    if _interativo is None:
+        try:
+            _interativo = _fluxo().isatty()
+        except (AttributeError, ValueError):
+            _interativo = False
+    return _interativo
+
+
+def ativo(nivel: int) -> bool:
+    """Indica se mensagens do nível informado são escritas"""
+    return _config["formato"] == "texto" and _config["nivel"] >= nivel
+
+
+def escrever(texto: str = "", nivel: int = RESUMO) -> None:
+    """Acumula uma mensagem, se o nível estiver ativo"""
+    global _tamanho
+
+    if not ativo(nivel):
+        return
+    _buffer.append(texto)
+    _tamanho += len(texto) + 1
+    if _tamanho >= _config["tamanho_buffer"] or _terminal():
+        descarregar()
+
+
+def resumo(dados: Dict, linhas: Optional[List[str]] = None) -> None:
+    """
+    Registra o resumo da execução. No formato texto as linhas são escritas no
+    nível RESUMO; no formato JSON os dados são acumulados e emitidos ao final.
+    """
+    _resumo.update(dados)
+    for linha in linhas or []:
+        escrever(linha, RESUMO)
+
+
+def descarregar() -> None:
+    """Escreve as mensagens acumuladas"""
+    global _tamanho
+
+    if _buffer:
+        fluxo = _fluxo()
+        fluxo.write("\n".join(_buffer) + "\n")
+        fluxo.flush()
+        _buffer.clear()
+        _tamanho = 0
+
+
+def finalizar() -> None:
+    """Escreve as mensagens pendentes e, no formato JSON, o resumo"""
+    descarregar()
+    if _config["formato"] == "json" and _resumo:
+        fluxo = _fluxo()
+        fluxo.write(json.dumps(_resumo, ensure_ascii=False) + "\n")
+        fluxo.flush()
+        _resumo.clear()
+
+
+atexit.register(finalizar)
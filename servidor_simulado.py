@@ -0,0 +1,330 @@
+"""
+Servidor local que simula a API de leilões para testes de carga e de falhas.
+
+Implementa os endpoints ``buscar-lotes`` (com ``nm_vendidos`` S/N) e
+``buscar-leilao`` a partir de lotes gravados (por exemplo, um arquivo do cache
+de consultar_lotes.py) ou de lotes sintéticos, com:
+- latência configurável por distribuição (fixa, uniforme, normal, lognormal,
+  exponencial), em milissegundos
+- taxa de respostas de erro (5xx) e de conexões encerradas sem resposta
+- corpo enviado em gotejamento (blocos de N bytes com pausa entre eles)
+- tamanho de payload ajustável (quantidade de lotes e tamanho da descrição)
+- compressão gzip opcional, quando o cliente aceita
+
+Para apontar os scripts de relatório para o simulador, use a URL impressa ao
+iniciar (``http://127.0.0.1:8765/leilao/buscar-lotes``) no arquivo de
+configuração.
+
+Exemplo de uso:
+    python servidor_simulado.py --lotes 2000 --latencia lognormal:80:0.5 --taxa-erro 0.02
+    python servidor_simulado.py --gravados .cache_leiloes/leilao_15324_prod.json --gotejamento 4096:10
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+CAMINHO_LOTES = "/leilao/buscar-lotes"
+STATUS_ERRO = (500, 502, 503)
+
+_DISTRIBUICOES = {
+    "fixa": 1,
+    "uniforme": 2,
+    "normal": 2,
+    "lognormal": 2,
+    "exponencial": 1,
+}
+
+
+def ler_distribuicao(texto: str) -> Callable[[random.Random], float]:
+    """
+    Converte "tipo:parametros" (em ms) em uma função que sorteia a latência em
+    segundos. Formatos: ``fixa:50``, ``uniforme:20:200``, ``normal:100:30``
+    (média e desvio), ``lognormal:80:0.5`` (mediana e sigma) e
+    ``exponencial:50`` (média). Um número simples equivale a ``fixa``.
+    """
+    tipo, _, resto = texto.partition(":")
+    if not resto:
+        tipo, resto = "fixa", texto
+    try:
+        parametros = [float(p) for p in resto.split(":")]
+    except ValueError:
+        parametros = []
+    if tipo not in _DISTRIBUICOES or len(parametros) != _DISTRIBUICOES[tipo] or min(parametros) < 0:
+        raise argparse.ArgumentTypeError(
+            f"Distribuição inválida: {texto!r} (use {', '.join(f'{t}:...' for t in _DISTRIBUICOES)})"
+        )
+
+    if tipo == "fixa":
+        return lambda rng: parametros[0] / 1000
+    if tipo == "uniforme":
+        return lambda rng: rng.uniform(*parametros) / 1000
+    if tipo == "normal":
+        return lambda rng: max(0.0, rng.gauss(*parametros)) / 1000
+    if tipo == "lognormal":
+        mu = math.log(parametros[0]) if parametros[0] > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, parametros[1]) / 1000
+    return lambda rng: (rng.expovariate(1 / parametros[0]) if parametros[0] else 0.0) / 1000
+
+
+def _ler_gotejamento(texto: str) -> Tuple[int, float]:
+    """Converte "BYTES:MS" no tamanho do bloco e na pausa em segundos"""
+    bloco, _, pausa = texto.partition(":")
+    try:
+        bloco, pausa = int(bloco), float(pausa or 0)
+    except ValueError:
+        bloco = 0
+    if bloco <= 0 or pausa < 0:
+        raise argparse.ArgumentTypeError(f"Gotejamento inválido: {texto!r} (use BYTES:MS)")
+    return bloco, pausa / 1000
+
+
+def _taxa(texto: str) -> float:
+    valor = float(texto)
+    if not 0 <= valor <= 1:
+        raise argparse.ArgumentTypeError(f"Taxa inválida: {texto!r} (use um valor entre 0 e 1)")
+    return valor
+
+
+def adicionar_argumentos(parser: argparse.ArgumentParser, porta_padrao: int = 8765) -> None:
+    """Acrescenta as opções do simulador ao parser"""
+    grupo = parser.add_argument_group("servidor simulado")
+    grupo.add_argument("--host", default="127.0.0.1")
+    grupo.add_argument("--porta", type=int, default=porta_padrao,
+                       help=f"Porta do servidor (padrão: {porta_padrao}; 0 escolhe uma livre)")
+    grupo.add_argument("--gravados", metavar="ARQUIVO.json",
+                       help="Lista de lotes gravados (por exemplo, do cache de consultar_lotes.py)")
+    grupo.add_argument("--lotes", type=int, default=500,
+                       help="Quantidade de lotes sintéticos por leilão, sem --gravados (padrão: 500)")
+    grupo.add_argument("--tamanho-descricao", type=int, default=400, metavar="BYTES",
+                       help="Tamanho da descrição de vistoria dos lotes sintéticos (padrão: 400)")
+    grupo.add_argument("--latencia", type=ler_distribuicao, default=ler_distribuicao("0"),
+                       metavar="DIST", help="Latência antes da resposta, ex.: lognormal:80:0.5 (ms)")
+    grupo.add_argument("--taxa-erro", type=_taxa, default=0.0,
+                       help="Fração das requisições respondidas com 500/502/503")
+    grupo.add_argument("--taxa-queda", type=_taxa, default=0.0,
+                       help="Fração das requisições em que a conexão é encerrada sem resposta")
+    grupo.add_argument("--gotejamento", type=_ler_gotejamento, metavar="BYTES:MS",
+                       help="Envia o corpo em blocos de BYTES com pausa de MS entre eles")
+    grupo.add_argument("--gzip", action="store_true",
+                       help="Compacta as respostas com gzip quando o cliente aceitar")
+    grupo.add_argument("--semente", type=int, help="Semente dos sorteios, para execuções reproduzíveis")
+
+
+def gerar_lotes(leilao_id: str, quantidade: int, tamanho_descricao: int = 400,
+                semente: int = 0) -> List[Dict]:
+    """Gera lotes sintéticos com os mesmos campos da API; metade vendidos"""
+    rng = random.Random(f"{semente}-{leilao_id}")
+    descricao = ("Veículo em bom estado de conservação, com sinais de uso. " * (tamanho_descricao // 57 + 1))
+    lotes = []
+    for i in range(1, quantidade + 1):
+        vendido = rng.random() < 0.5
+        avaliacao = rng.randrange(5_000, 200_000, 500)
+        minimo = round(avaliacao * 0.6, 2)
+        lotes.append({
+            "url_leiloeiro": "www.giordanoleiloes.com.br",
+            "leilao_id": str(leilao_id),
+            "nm_leilao": f"LEILÃO SIMULADO {leilao_id}",
+            "dt_leilao": "2025-03-15 10:00:00",
+            "tipo_leilao": "Online",
+            "nm_leiloeiro": "Leiloeiro Simulado",
+            "lote_id": int(leilao_id) * 100_000 + i if str(leilao_id).isdigit() else i,
+            "nu_lote": f"{i}A" if i % 50 == 0 else str(i),
+            "nm_lote": f"Lote {i}",
+            "descricao": f"Lote simulado {i}",
+            "nm_descricao_vistoria": f"<p>{descricao[:tamanho_descricao]}</p>",
+            "nm_status": "Vendido" if vendido else "Não Vendido",
+            "vl_avaliacao": f"{avaliacao:.2f}",
+            "vl_minimo": f"{minimo:.2f}",
+            "nu_parcelas": 1,
+            "vl_comissao": "5.00",
+            "nu_comissao": 5,
+            "dt_lance": "2025-03-15 10:30:00" if vendido else None,
+            "nu_total_lance": rng.randint(1, 40) if vendido else 0,
+            # Como na API, lotes não vendidos vêm sem o campo "arrematacao"
+            **({"arrematacao": {"vl": f"{minimo * rng.uniform(1, 1.6):.2f}"}} if vendido else {}),
+            "tipo_arrematacao": "Online" if vendido else None,
+            "processo": f"{i:07d}-00.2025.8.26.0000",
+            "nm_osa": f"{i:04d}/2025",
+            "tp_alienacao": "Venda Direta",
+            "nm_usuario": f"usuario{rng.randint(1, 300)}" if vendido else None,
+            "nm_estado": rng.choice(("SP", "PR", "SC", "MG")),
+            "nm_cpfoucnpj": None,
+        })
+    return lotes
+
+
+def _vendido(lote: Dict) -> bool:
+    return str(lote.get("nm_status", "")).strip().upper() == "VENDIDO"
+
+
+class Simulador:
+    """Gera e guarda em cache as respostas e sorteia latência e falhas"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.semente)
+        self._lock = threading.Lock()
+        self._respostas: Dict[Tuple[str, str], bytes] = {}
+        self._gravados: Optional[List[Dict]] = None
+        if args.gravados:
+            with open(args.gravados, encoding="utf-8") as f:
+                self._gravados = json.load(f)
+        self.estatisticas = {"requisicoes": 0, "erros": 0, "quedas": 0, "bytes": 0}
+
+    def _lotes(self, leilao_id: str) -> List[Dict]:
+        if self._gravados is not None:
+            return self._gravados
+        return gerar_lotes(leilao_id, self.args.lotes, self.args.tamanho_descricao, self.args.semente or 0)
+
+    def quantidade_lotes(self, leilao_id: str) -> int:
+        """Quantidade de lotes (vendidos e não vendidos) servidos para o leilão"""
+        return len(self._lotes(leilao_id))
+
+    def resposta(self, caminho: str, formulario: Dict[str, str]) -> Optional[bytes]:
+        """Corpo JSON do endpoint, ou None se o caminho não existir"""
+        leilao_id = formulario.get("leilao_id", "0")
+        if caminho.endswith("buscar-leilao"):
+            chave = (leilao_id, "leilao")
+        elif caminho.endswith("buscar-lotes"):
+            chave = (leilao_id, formulario.get("nm_vendidos", "S").upper())
+        else:
+            return None
+
+        with self._lock:
+            corpo = self._respostas.get(chave)
+        if corpo is None:
+            lotes = self._lotes(leilao_id)
+            if chave[1] == "leilao":
+                nm_leilao = lotes[0].get("nm_leilao") if lotes else f"LEILÃO SIMULADO {leilao_id}"
+                dados = {"leilao_id": leilao_id, "nm_leilao": nm_leilao}
+            else:
+                dados = [lote for lote in lotes if _vendido(lote) == (chave[1] == "S")]
+            corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+            with self._lock:
+                self._respostas[chave] = corpo
+        return corpo
+
+    def sortear(self) -> Tuple[float, Optional[str], int]:
+        """
+        Sorteia a latência (s) e a falha da requisição: None, "erro" (com o
+        status sorteado) ou "queda".
+        """
+        with self._lock:
+            self.estatisticas["requisicoes"] += 1
+            latencia = self.args.latencia(self.rng)
+            sorteio = self.rng.random()
+            status = self.rng.choice(STATUS_ERRO)
+            if sorteio < self.args.taxa_queda:
+                falha = "queda"
+            elif sorteio < self.args.taxa_queda + self.args.taxa_erro:
+                falha = "erro"
+            else:
+                falha, status = None, 200
+            if falha:
+                self.estatisticas[f"{falha}s"] += 1
+        return latencia, falha, status
+
+    def registrar_envio(self, tamanho: int) -> None:
+        with self._lock:
+            self.estatisticas["bytes"] += tamanho
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        logging.debug(f"{self.address_string()} - {formato % args}")
+
+    def _enviar(self, status: int, corpo: bytes, tipo: str = "application/json; charset=utf-8") -> None:
+        simulador: Simulador = self.server.simulador
+        cabecalhos = {"Content-Type": tipo}
+        if simulador.args.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            corpo = gzip.compress(corpo, compresslevel=6)
+            cabecalhos["Content-Encoding"] = "gzip"
+        cabecalhos["Content-Length"] = str(len(corpo))
+
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+
+        if simulador.args.gotejamento:
+            bloco, pausa = simulador.args.gotejamento
+            for inicio in range(0, len(corpo), bloco):
+                self.wfile.write(corpo[inicio:inicio + bloco])
+                self.wfile.flush()
+                time.sleep(pausa)
+        else:
+            self.wfile.write(corpo)
+        simulador.registrar_envio(len(corpo))
+
+    def do_POST(self):
+        simulador: Simulador = self.server.simulador
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        formulario = {k: v[0] for k, v in parse_qs(self.rfile.read(tamanho).decode("utf-8")).items()}
+
+        latencia, falha, status = simulador.sortear()
+        time.sleep(latencia)
+
+        if falha == "queda":
+            self.close_connection = True
+            return
+        if falha == "erro":
+            self._enviar(status, f"<html><body>Erro {status} simulado</body></html>".encode(), "text/html")
+            return
+
+        corpo = simulador.resposta(self.path, formulario)
+        if corpo is None:
+            self._enviar(404, b'{"erro": "endpoint inexistente"}')
+        else:
+            self._enviar(200, corpo)
+
+
+def criar_servidor(args: argparse.Namespace) -> ThreadingHTTPServer:
+    """Cria o servidor com as opções de adicionar_argumentos (sem iniciá-lo)"""
+    servidor = ThreadingHTTPServer((args.host, args.porta), _Manipulador)
+    servidor.daemon_threads = True
+    servidor.simulador = Simulador(args)
+    return servidor
+
+
+def url_lotes(servidor: ThreadingHTTPServer) -> str:
+    """URL do endpoint buscar-lotes do servidor"""
+    host, porta = servidor.server_address[:2]
+    return f"http://{host}:{porta}{CAMINHO_LOTES}"
+
+
+def iniciar_em_segundo_plano(args: argparse.Namespace) -> ThreadingHTTPServer:
+    """Inicia o servidor em uma thread; encerre com servidor.shutdown()"""
+    servidor = criar_servidor(args)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Servidor local que simula a API de leilões")
+    adicionar_argumentos(parser)
+    parser.add_argument("--verboso", action="store_true", help="Registra cada requisição")
+    args = parser.parse_args()
+    if args.verboso:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    servidor = criar_servidor(args)
+    logging.info(f"Simulador da API em {url_lotes(servidor)} (buscar-leilao no mesmo diretório)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        logging.info(f"Encerrado: {servidor.simulador.estatisticas}")
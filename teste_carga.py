@@ -0,0 +1,279 @@
+"""
+Teste de carga do caminho de busca e geração de relatório.
+
+Executa o pipeline de relatório (busca dos lotes vendidos e não vendidos,
+projeção, ordenação e quadro resumo; opcionalmente o documento Word ou o
+relatório Excel) várias vezes em paralelo contra o servidor simulado
+(servidor_simulado.py) e informa a vazão, a taxa de falhas e as latências
+p50/p90/p99 de ponta a ponta e da etapa de busca. Com ``--relatorio excel``
+cada execução chama as funções de main.py (fazer_requisicao e
+gerar_relatorio) e com ``--relatorio word`` as de main_word.py (buscar_lotes
+e gerar_relatorio).
+
+Como os scripts descartam as respostas de erro da API e seguem com o leilão
+incompleto, cada execução confere a quantidade de lotes obtida com a
+esperada; execuções com lotes faltando contam como falha (LeilaoIncompleto).
+A quantidade esperada vem do simulador iniciado no próprio processo ou, com
+``--url``, de uma busca de referência feita antes da carga.
+
+Sem ``--url`` o servidor simulado é iniciado no próprio processo, com as
+opções de latência, falhas e payload de servidor_simulado.py. Com
+``--p99-maximo`` o script termina com código 1 se o p99 exceder o limite,
+permitindo usá-lo como benchmark em CI.
+
+Exemplo de uso:
+    python teste_carga.py --execucoes 200 --concorrencia 8 --latencia lognormal:80:0.5 --taxa-erro 0.01
+    python teste_carga.py --url http://127.0.0.1:8765/leilao/buscar-lotes --relatorio word --p99-maximo 2000
+    python teste_carga.py --relatorio excel --execucoes 50
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import api_leiloes
+import indice_lotes
+import ingestao
+import resumo
+import saida
+import servidor_simulado
+import transporte
+
+# Campos usados pelo pipeline sem relatório (quadro resumo e ordenação)
+CAMPOS_CARGA = ("nm_status", "nm_osa", "vl_avaliacao", "vl_minimo", "arrematacao")
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo; ``valores`` já ordenados"""
+    if not valores:
+        return 0.0
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+def resumir_latencias(valores: List[float]) -> Dict[str, float]:
+    """p50, p90, p99 e máximo em milissegundos"""
+    valores = sorted(valores)
+    return {
+        "p50_ms": round(percentil(valores, 50) * 1000, 1),
+        "p90_ms": round(percentil(valores, 90) * 1000, 1),
+        "p99_ms": round(percentil(valores, 99) * 1000, 1),
+        "max_ms": round((valores[-1] if valores else 0.0) * 1000, 1),
+    }
+
+
+class LeilaoIncompleto(Exception):
+    """A execução obteve menos lotes que o esperado"""
+
+
+def _conferir_lotes(lotes, leilao_id: str, esperado: Optional[int]) -> None:
+    """Levanta LeilaoIncompleto se a quantidade de lotes difere da esperada"""
+    obtidos = len(lotes) if lotes else 0
+    if not obtidos or (esperado is not None and obtidos != esperado):
+        raise LeilaoIncompleto(f"Leilão {leilao_id}: {obtidos} de {esperado if esperado is not None else '?'} lotes")
+
+
+def contar_lotes(url: str, leilao_id: str, tentativas: int = 5) -> int:
+    """Quantidade de lotes do leilão em uma busca de referência, com novas tentativas em caso de erro"""
+    for tentativa in range(1, tentativas + 1):
+        try:
+            return len(api_leiloes.buscar_todos_lotes(url, leilao_id,
+                                                      url_leiloeiro=api_leiloes.URL_LEILOEIRO_PROD))
+        except Exception as e:
+            if tentativa == tentativas:
+                raise
+            logging.warning(f"Busca de referência do leilão {leilao_id} falhou ({e}); tentando novamente")
+
+
+def _pipeline_excel(url: str, leilao_id: str, arquivo: str, esperado: Optional[int]) -> Dict[str, float]:
+    """Busca e relatório Excel pelas funções de main.py"""
+    import main
+
+    inicio = time.perf_counter()
+    lotes = main.fazer_requisicao(leilao_id, url=url)
+    busca = time.perf_counter() - inicio
+    _conferir_lotes(lotes, leilao_id, esperado)
+
+    if not main.gerar_relatorio(lotes, arquivo=arquivo):
+        raise RuntimeError(f"Falha ao gerar o relatório Excel do leilão {leilao_id}")
+    os.remove(arquivo)
+    return {"busca": busca, "total": time.perf_counter() - inicio}
+
+
+def _pipeline_word(url: str, leilao_id: str, arquivo: str, esperado: Optional[int]) -> Dict[str, float]:
+    """Busca e relatório Word pelas funções de main_word.py"""
+    import main_word
+
+    inicio = time.perf_counter()
+    lotes, nm_leilao = main_word.buscar_lotes(leilao_id, url=url)
+    busca = time.perf_counter() - inicio
+    _conferir_lotes(lotes, leilao_id, esperado)
+
+    for gerado in main_word.gerar_relatorio(lotes, nm_leilao, os.path.splitext(arquivo)[0]):
+        os.remove(gerado)
+    return {"busca": busca, "total": time.perf_counter() - inicio}
+
+
+def executar_pipeline(url: str, leilao_id: str, relatorio: str = "nenhum",
+                      arquivo: Optional[str] = None, esperado: Optional[int] = None) -> Dict[str, float]:
+    """
+    Executa o pipeline de relatório uma vez e retorna as durações (s) da busca
+    e total. Com relatorio "word" ou "excel" o documento é gravado em
+    ``arquivo`` e removido. Com ``esperado``, levanta LeilaoIncompleto se a
+    quantidade de lotes obtida for diferente.
+    """
+    if relatorio == "excel":
+        return _pipeline_excel(url, leilao_id, arquivo, esperado)
+    if relatorio == "word":
+        return _pipeline_word(url, leilao_id, arquivo, esperado)
+
+    inicio = time.perf_counter()
+    lotes_api = api_leiloes.buscar_todos_lotes(url, leilao_id, url_leiloeiro=api_leiloes.URL_LEILOEIRO_PROD)
+    busca = time.perf_counter() - inicio
+
+    lotes = ingestao.projetar_lotes(lotes_api, CAMPOS_CARGA)
+    del lotes_api
+    _conferir_lotes(lotes, leilao_id, esperado)
+    indice_lotes.ordenar_lotes(lotes)
+
+    quadro = resumo.QuadroResumo()
+    for lote in lotes:
+        quadro.adicionar(str(lote.get("nm_status", "")).strip().upper() == "VENDIDO",
+                         api_leiloes.valor_arrematado(lote))
+
+    return {"busca": busca, "total": time.perf_counter() - inicio}
+
+
+def executar_carga(url: str, leiloes: List[str], execucoes: int, concorrencia: int,
+                   relatorio: str = "nenhum", lotes_esperados: Optional[Dict[str, int]] = None) -> Dict:
+    """
+    Executa o pipeline ``execucoes`` vezes com ``concorrencia`` em paralelo.
+    ``lotes_esperados`` (por leilão) é repassado a executar_pipeline.
+    """
+    lotes_esperados = lotes_esperados or {}
+    duracoes: List[Dict[str, float]] = []
+    falhas = Counter()
+    lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory(prefix="teste_carga_") as diretorio:
+        def tarefa(numero: int):
+            leilao_id = leiloes[numero % len(leiloes)]
+            extensao = {"word": "docx", "excel": "xlsx"}.get(relatorio)
+            arquivo = os.path.join(diretorio, f"execucao_{numero}.{extensao}") if extensao else None
+            try:
+                duracao = executar_pipeline(url, leilao_id, relatorio, arquivo, lotes_esperados.get(leilao_id))
+            except Exception as e:
+                with lock:
+                    falhas[type(e).__name__] += 1
+                logging.debug(f"Execução {numero} (leilão {leilao_id}) falhou: {e}")
+            else:
+                with lock:
+                    duracoes.append(duracao)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            list(executor.map(tarefa, range(execucoes)))
+        segundos = time.perf_counter() - inicio
+
+    return {
+        "execucoes": execucoes,
+        "concorrencia": concorrencia,
+        "relatorio": relatorio,
+        "segundos": round(segundos, 3),
+        "sucessos": len(duracoes),
+        "falhas": dict(falhas),
+        "taxa_falhas": round(sum(falhas.values()) / execucoes, 4) if execucoes else 0.0,
+        "vazao_por_s": round(len(duracoes) / segundos, 2) if segundos else 0.0,
+        "total": resumir_latencias([d["total"] for d in duracoes]),
+        "busca": resumir_latencias([d["busca"] for d in duracoes]),
+        "trafego": transporte.estatisticas(),
+    }
+
+
+def imprimir(resultado: Dict, servidor: Optional[Dict] = None) -> None:
+    """Imprime o resumo do teste de carga"""
+    print("=" * 50)
+    print("TESTE DE CARGA")
+    print("=" * 50)
+    print(f"Execuções: {resultado['execucoes']} (concorrência {resultado['concorrencia']}, "
+          f"relatório: {resultado['relatorio']}) em {resultado['segundos']} s")
+    print(f"Sucessos: {resultado['sucessos']} - vazão: {resultado['vazao_por_s']} execuções/s")
+    print(f"Falhas: {sum(resultado['falhas'].values())} ({resultado['taxa_falhas'] * 100:.2f}%)"
+          + "".join(f"\n- {tipo}: {qtd}" for tipo, qtd in resultado["falhas"].items()))
+    for etapa in ("total", "busca"):
+        lat = resultado[etapa]
+        print(f"Latência {etapa}: p50 {lat['p50_ms']} ms | p90 {lat['p90_ms']} ms | "
+              f"p99 {lat['p99_ms']} ms | máx {lat['max_ms']} ms")
+    print(f"Tráfego: {resultado['trafego']['requisicoes']} requisições, "
+          f"{resultado['trafego']['bytes_rede']} bytes na rede")
+    if servidor:
+        print(f"Servidor simulado: {servidor}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Teste de carga do pipeline de relatório contra a API simulada")
+    parser.add_argument("--url", help="URL de buscar-lotes de um simulador já em execução "
+                                      "(padrão: inicia o simulador no próprio processo)")
+    parser.add_argument("--leilao", action="append", metavar="ID",
+                        help="ID de leilão consultado (pode repetir; padrão: 15324)")
+    parser.add_argument("--execucoes", type=int, default=100, help="Quantidade de execuções do pipeline")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Execuções simultâneas")
+    parser.add_argument("--relatorio", choices=["nenhum", "word", "excel"], default="nenhum",
+                        help="Gera também o documento Word (pelas funções de main_word.py) ou o "
+                             "relatório Excel (pelas de main.py) em cada execução")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout das requisições (s)")
+    parser.add_argument("--p99-maximo", type=float, metavar="MS",
+                        help="Falha (código 1) se o p99 de ponta a ponta exceder MS")
+    parser.add_argument("--json", dest="arquivo_json", help="Salva o resultado em JSON")
+    servidor_simulado.adicionar_argumentos(parser, porta_padrao=0)
+    args = parser.parse_args()
+
+    if args.execucoes <= 0 or args.concorrencia <= 0:
+        parser.error("--execucoes e --concorrencia devem ser maiores que zero")
+
+    # As mensagens de andamento de main.py não são exibidas durante a carga
+    saida.configurar_saida(nivel=saida.SILENCIOSO)
+
+    servidor = None
+    url = args.url
+    if not url:
+        servidor = servidor_simulado.iniciar_em_segundo_plano(args)
+        url = servidor_simulado.url_lotes(servidor)
+
+    # Duas requisições por execução (vendidos e não vendidos) em paralelo
+    transporte.configurar_transporte(timeout=args.timeout, max_connections=2 * args.concorrencia)
+    leiloes = args.leilao or ["15324"]
+    try:
+        if servidor is not None:
+            lotes_esperados = {leilao_id: servidor.simulador.quantidade_lotes(leilao_id) for leilao_id in leiloes}
+        else:
+            lotes_esperados = {leilao_id: contar_lotes(url, leilao_id) for leilao_id in leiloes}
+        # main_word.py escreve o andamento com print
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            resultado = executar_carga(url, leiloes, args.execucoes, args.concorrencia,
+                                       args.relatorio, lotes_esperados)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+
+    estatisticas_servidor = servidor.simulador.estatisticas if servidor is not None else None
+    imprimir(resultado, estatisticas_servidor)
+
+    if args.arquivo_json:
+        with open(args.arquivo_json, "w", encoding="utf-8") as f:
+            json.dump({**resultado, "servidor": estatisticas_servidor}, f, ensure_ascii=False, indent=2)
+
+    if args.p99_maximo is not None and resultado["total"]["p99_ms"] > args.p99_maximo:
+        print(f"\np99 de {resultado['total']['p99_ms']} ms excede o limite de {args.p99_maximo} ms")
+        sys.exit(1)
@@ -0,0 +1,74 @@
+import os
+
+import openpyxl
+
+import consolidado
+from resumo import QuadroResumo
+
+
+def _adicionar(diretorio, leilao_id, valores):
+    quadro = QuadroResumo()
+    lotes = []
+    for numero, valor in enumerate(valores, start=1):
+        quadro.adicionar(valor > 0, valor)
+        lotes.append({"N° Lote": str(numero), "Status": "VENDIDO" if valor > 0 else "NÃO VENDIDO",
+                      "Valor arrematado": valor})
+    consolidado.adicionar_leilao(str(diretorio), leilao_id, f"LEILÃO {leilao_id}", iter(lotes), quadro)
+
+
+def _linhas(arquivo):
+    planilha = openpyxl.load_workbook(arquivo).active
+    return [list(linha) for linha in planilha.iter_rows(values_only=True)]
+
+
+def test_adicionar_leiloes(tmp_path):
+    _adicionar(tmp_path, "1", [100.0, 0])
+    _adicionar(tmp_path, "2", [50.5])
+
+    assert sorted(os.listdir(tmp_path)) == ["RESUMO GERAL.xlsx", "leilao_1.xlsx", "leilao_2.xlsx", "leiloes.jsonl"]
+    assert _linhas(tmp_path / "leilao_1.xlsx") == [
+        ["N° Lote", "Status", "Valor arrematado"],
+        ["1", "VENDIDO", 100],
+        ["2", "NÃO VENDIDO", 0],
+    ]
+    resumo = _linhas(tmp_path / "RESUMO GERAL.xlsx")
+    assert [linha[:4] for linha in resumo[1:]] == [
+        ["1", "LEILÃO 1", 2, 1], ["2", "LEILÃO 2", 1, 1], ["TOTAL", "2 leilões", 3, 2],
+    ]
+    assert resumo[-1][7] == 150.5
+
+    planilha = openpyxl.load_workbook(tmp_path / "RESUMO GERAL.xlsx").active
+    assert planilha.title == "RESUMO GERAL"
+    assert planilha["A1"].font.b
+    assert planilha["H2"].number_format == "#,##0.00"
+
+
+def test_acrescimo_nao_regrava_leiloes_anteriores(tmp_path):
+    _adicionar(tmp_path, "1", [100.0])
+    _adicionar(tmp_path, "2", [200.0])
+    estado_leilao_2 = os.stat(tmp_path / "leilao_2.xlsx")
+
+    _adicionar(tmp_path, "3", [300.0])
+    _adicionar(tmp_path, "1", [10.0, 20.0])
+
+    assert os.stat(tmp_path / "leilao_2.xlsx").st_mtime_ns == estado_leilao_2.st_mtime_ns
+    assert _linhas(tmp_path / "leilao_1.xlsx")[1:] == [["1", "VENDIDO", 10], ["2", "VENDIDO", 20]]
+
+    # O registro de totais só recebe linhas; no resumo vale a última de cada leilão
+    with open(tmp_path / "leiloes.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 4
+    resumo = _linhas(tmp_path / "RESUMO GERAL.xlsx")
+    assert [linha[0] for linha in resumo[1:]] == ["1", "2", "3", "TOTAL"]
+    assert resumo[1][2] == 2
+    assert resumo[-1][:3] == ["TOTAL", "3 leilões", 4]
+    assert resumo[-1][7] == 530
+
+
+def test_linha_incompleta_e_ignorada(tmp_path):
+    _adicionar(tmp_path, "1", [100.0])
+    with open(tmp_path / "leiloes.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"leilao_id": "2", "nm_le\n')
+
+    _adicionar(tmp_path, "3", [300.0])
+
+    assert [leilao["leilao_id"] for leilao in consolidado.ler_leiloes(str(tmp_path))] == ["1", "3"]
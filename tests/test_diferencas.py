@@ -0,0 +1,27 @@
+from diferencas import comparar_indices, indexar_lotes
+
+
+def test_indexar_lotes_registra_chaves_duplicadas():
+    lotes = [
+        {"lote_id": 1, "nu_lote": "1", "nm_status": "Vendido"},
+        {"lote_id": 1, "nu_lote": "1", "nm_status": "Não Vendido"},
+        {"lote_id": 1, "nu_lote": "1"},
+        {"lote_id": None, "nu_lote": "2"},
+    ]
+    duplicados = {}
+    indice = indexar_lotes(lotes, "lote_id", duplicados)
+
+    assert list(indice) == ["1", "2"]
+    assert indice["1"]["nm_status"] == "Vendido"
+    assert duplicados == {"1": 3}
+
+
+def test_comparar_indices():
+    anterior = indexar_lotes([{"lote_id": 1, "vl": 1}, {"lote_id": 2, "vl": 2}], "lote_id")
+    atual = indexar_lotes([{"lote_id": 2, "vl": 3}, {"lote_id": 4, "vl": 4}], "lote_id")
+
+    adicionados, removidos, alterados = comparar_indices(anterior, atual)
+
+    assert adicionados == ["4"]
+    assert removidos == ["1"]
+    assert alterados == {"2": {"vl": [2, 3]}}
@@ -0,0 +1,21 @@
+from indice_lotes import chave_natural, ordenar_lotes
+
+
+def test_chave_natural_compara_numeros_como_inteiros():
+    assert chave_natural("2") < chave_natural("10")
+    assert chave_natural("10") < chave_natural("10A") < chave_natural("11")
+    assert chave_natural("10a") == chave_natural("10A")
+    assert chave_natural("Lote 9") < chave_natural("lote 10")
+
+
+def test_chave_natural_trata_digitos_nao_ascii_como_texto():
+    assert chave_natural("1²") == ((0, 1, ""), (1, 0, "²"))
+    assert chave_natural("１２") == ((1, 0, "１２"),)
+    assert chave_natural("1") < chave_natural("1²") < chave_natural("2")
+
+
+def test_ordenar_lotes():
+    lotes = [{"nu_lote": n} for n in ["10", "2", "10A", "1²", None, "10a", "B", "1"]]
+    ordenar_lotes(lotes)
+
+    assert [lote["nu_lote"] for lote in lotes] == [None, "1", "1²", "2", "10", "10A", "10a", "B"]
@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import openpyxl
+import pytest
+
+import servidor_simulado
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def servidor():
+    parser = argparse.ArgumentParser()
+    servidor_simulado.adicionar_argumentos(parser, porta_padrao=0)
+    servidor = servidor_simulado.iniciar_em_segundo_plano(parser.parse_args(["--lotes", "120", "--semente", "1"]))
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _executar_main(diretorio, url, *opcoes):
+    (diretorio / "config.py").write_text(
+        f"API_CONFIG = {{'url': {url!r}, 'headers': {{}}}}\n"
+        "REQUEST_CONFIG = {}\n"
+        "FILE_CONFIG = {'output_file': 'relatorio.xlsx', 'sheets': {'lotes': 'Lotes', 'resumo': 'Resumo'}}\n",
+        encoding="utf-8",
+    )
+    ambiente = dict(os.environ)
+    ambiente["PYTHONPATH"] = os.pathsep.join(filter(None, [str(diretorio), RAIZ, ambiente.get("PYTHONPATH")]))
+    processo = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, "main.py"), "15324", "--json", *opcoes],
+        cwd=diretorio, env=ambiente, capture_output=True, text=True, timeout=120,
+    )
+    assert processo.returncode == 0, processo.stderr
+    return json.loads(processo.stdout)
+
+
+def test_main_contra_servidor_simulado(servidor, tmp_path):
+    lotes = servidor_simulado.gerar_lotes("15324", 120, semente=1)
+    vendidos = [lote for lote in lotes if "arrematacao" in lote]
+    assert all(lote["nm_status"] == "Vendido" for lote in vendidos)
+
+    url = servidor_simulado.url_lotes(servidor)
+    resumo = _executar_main(tmp_path, url)
+    assert resumo["total_lotes"] == 120
+    assert resumo["lotes_vendidos"] == len(vendidos)
+
+    planilha = openpyxl.load_workbook(tmp_path / "relatorio.xlsx")["Lotes"]
+    linhas = list(planilha.iter_rows(values_only=True))
+    assert len(linhas) == 121
+    assert [linha[0] for linha in linhas[1:4]] == ["1", "2", "3"]
+
+    # Com limite de memória (ordenação em disco) o resultado é o mesmo
+    assert _executar_main(tmp_path, url, "--limite-memoria", "0.01") == resumo
+    planilha = openpyxl.load_workbook(tmp_path / "relatorio.xlsx")["Lotes"]
+    assert list(planilha.iter_rows(values_only=True)) == linhas
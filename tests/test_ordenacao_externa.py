@@ -0,0 +1,23 @@
+import random
+
+import indice_lotes
+from ordenacao_externa import OrdenadorExterno
+
+
+def _lotes():
+    sorteio = random.Random(7)
+    return [{"nu_lote": str(sorteio.choice([1, 2, 2, 10, "10A", "10a", 3])), "ordem": i} for i in range(200)]
+
+
+def test_mesma_ordem_em_memoria_e_em_disco(tmp_path):
+    esperado = _lotes()
+    indice_lotes.ordenar_lotes(esperado)
+
+    for limite in (10 ** 9, 200):
+        with OrdenadorExterno(limite, diretorio=str(tmp_path)) as ordenador:
+            ordenador.extend(_lotes())
+            assert len(ordenador) == 200
+            assert list(ordenador) == esperado
+            assert list(ordenador) == esperado
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,78 @@
+from resumo import QuadroResumo
+from resumo_ao_vivo import Difusor, MonitorLeilao
+
+
+def _lote(lote_id, vendido=False, valor=0.0):
+    lote = {"leilao_id": "15324", "nm_leilao": "LEILÃO 15324", "lote_id": lote_id,
+            "nu_lote": str(lote_id), "nm_status": "Vendido" if vendido else "Não Vendido"}
+    if vendido:
+        lote["arrematacao"] = {"vl": str(valor)}
+    return lote
+
+
+def _totais(monitor):
+    resumo = monitor.resumo()
+    return resumo["total_arrematados"], resumo["total_nao_arrematados"], resumo["valor_total_arrematado"]
+
+
+def _recalculado(lotes):
+    quadro = QuadroResumo()
+    for lote in lotes:
+        quadro.adicionar(lote["nm_status"] == "Vendido", float(lote.get("arrematacao", {}).get("vl", 0)))
+    return quadro.total_arrematados, quadro.total_nao_arrematados, quadro.valor_total_arrematado
+
+
+def test_totais_incrementais_ao_adicionar_alterar_e_remover():
+    monitor = MonitorLeilao("15324")
+
+    consulta = [_lote(1), _lote(2), _lote(3, True, 100.0)]
+    evento = monitor.atualizar(consulta)
+    assert [lote["lote_id"] for lote in evento["adicionados"]] == [1, 2, 3]
+    assert _totais(monitor) == (1, 2, 100.0) == _recalculado(consulta)
+    assert monitor.atualizar(consulta) is None
+
+    # Lote 1 vendido, lote 3 com novo valor
+    consulta = [_lote(1, True, 50.0), _lote(2), _lote(3, True, 120.0)]
+    evento = monitor.atualizar(consulta)
+    assert sorted(evento["diferencas"]) == ["1", "3"]
+    assert evento["adicionados"] == [] and evento["removidos"] == []
+    assert _totais(monitor) == (2, 1, 170.0) == _recalculado(consulta)
+
+    # Lote 3 retirado e lote 4 incluído
+    consulta = [_lote(1, True, 50.0), _lote(2), _lote(4)]
+    evento = monitor.atualizar(consulta)
+    assert evento["removidos"] == ["3"]
+    assert [lote["lote_id"] for lote in evento["adicionados"]] == [4]
+    assert _totais(monitor) == (1, 2, 50.0) == _recalculado(consulta)
+    assert evento["resumo"]["total_lotes"] == 3
+    assert evento["sequencia"] == 3
+
+
+def test_chaves_repetidas_sao_informadas():
+    monitor = MonitorLeilao("15324")
+
+    evento = monitor.atualizar([_lote(1, True, 10.0), _lote(1), _lote(2)])
+    assert evento["resumo"]["duplicados"] == {"1": 2}
+    assert _totais(monitor) == (1, 1, 10.0)
+
+    # Sem mudança nos lotes, mas a repetição deixou de existir
+    evento = monitor.atualizar([_lote(1, True, 10.0), _lote(2)])
+    assert evento is not None
+    assert evento["resumo"]["duplicados"] == {}
+    assert _totais(monitor) == (1, 1, 10.0)
+
+
+def test_difusor_desconecta_inscrito_lento():
+    difusor = Difusor(tamanho_fila=2)
+    rapido = difusor.inscrever()
+    lento = difusor.inscrever()
+
+    recebidos = []
+    for sequencia in range(1, 4):
+        difusor.publicar({"tipo": "atualizacao", "sequencia": sequencia})
+        recebidos.append(rapido.get_nowait())
+
+    assert [mensagem[1] for mensagem in recebidos] == [1, 2, 3]
+    assert len(difusor) == 1
+    assert lento.get_nowait() is None
+    assert lento.empty()
@@ -0,0 +1,162 @@
+"""
+Transporte HTTP compartilhado pelos scripts de relatório de leilão.
+
+Todos os scripts (produção e homologação) usam um único httpx.Client por
+processo, o que permite reaproveitar conexões entre as requisições de lotes
+vendidos, não vendidos e de informações do leilão. Quando as dependências
+opcionais estão instaladas o cliente negocia HTTP/2 (pacote ``h2``) e aceita
+respostas comprimidas com brotli (pacote ``brotli``), além de gzip/deflate.
+
+Cada resposta registra no log a quantidade de bytes trafegados na rede e a
+quantidade de bytes após a descompressão, e ao final do processo é registrado
+o total acumulado.
+
+Exemplo de uso:
+    import transporte
+
+    transporte.configurar_transporte(verify=False)
+    response = transporte.post(url, data=form_data, headers=headers)
+"""
+
+import atexit
+import importlib.util
+import logging
+import threading
+from typing import Dict, Optional
+
+import httpx
+
+HTTP2_DISPONIVEL = importlib.util.find_spec("h2") is not None
+BROTLI_DISPONIVEL = (
+    importlib.util.find_spec("brotli") is not None
+    or importlib.util.find_spec("brotlicffi") is not None
+)
+
+_config = {
+    "http2": HTTP2_DISPONIVEL,
+    "verify": True,
+    "follow_redirects": True,
+    "timeout": 30.0,
+    "max_connections": 10,
+}
+
+_cliente: Optional[httpx.Client] = None
+_lock = threading.Lock()
+_estatisticas = {
+    "requisicoes": 0,
+    "bytes_rede": 0,
+    "bytes_decodificados": 0,
+}
+
+
+def _accept_encoding() -> str:
+    """Monta o cabeçalho Accept-Encoding conforme os decodificadores instalados"""
+    return "br, gzip, deflate" if BROTLI_DISPONIVEL else "gzip, deflate"
+
+
+def configurar_transporte(**opcoes) -> None:
+    """
+    Ajusta as opções do cliente compartilhado.
+
+    Opções aceitas: http2, verify, follow_redirects, timeout e max_connections.
+    Se o cliente já tiver sido criado ele é fechado e recriado na próxima
+    requisição com as novas opções.
+    """
+    global _cliente
+
+    desconhecidas = set(opcoes) - set(_config)
+    if desconhecidas:
+        raise ValueError(f"Opções de transporte desconhecidas: {sorted(desconhecidas)}")
+
+    if opcoes.get("http2") and not HTTP2_DISPONIVEL:
+        logging.warning("HTTP/2 solicitado, mas o pacote 'h2' não está instalado. Usando HTTP/1.1.")
+        opcoes["http2"] = False
+
+    with _lock:
+        _config.update(opcoes)
+        if _cliente is not None:
+            _cliente.close()
+            _cliente = None
+
+
+def obter_cliente() -> httpx.Client:
+    """Retorna o cliente HTTP do processo, criando-o na primeira chamada"""
+    global _cliente
+
+    with _lock:
+        if _cliente is None:
+            _cliente = httpx.Client(
+                http2=_config["http2"],
+                verify=_config["verify"],
+                follow_redirects=_config["follow_redirects"],
+                timeout=_config["timeout"],
+                limits=httpx.Limits(max_connections=_config["max_connections"]),
+                headers={"Accept-Encoding": _accept_encoding()},
+            )
+            logging.info(
+                f"Cliente HTTP criado (http2={_config['http2']}, "
+                f"Accept-Encoding: {_accept_encoding()})"
+            )
+        return _cliente
+
+
+def _registrar_trafego(response: httpx.Response) -> None:
+    """Registra bytes na rede e bytes decodificados de uma resposta já lida"""
+    bytes_rede = response.num_bytes_downloaded
+    bytes_decodificados = len(response.content)
+
+    with _lock:
+        _estatisticas["requisicoes"] += 1
+        _estatisticas["bytes_rede"] += bytes_rede
+        _estatisticas["bytes_decodificados"] += bytes_decodificados
+
+    economia = (1 - bytes_rede / bytes_decodificados) * 100 if bytes_decodificados else 0
+    logging.info(
+        f"{response.request.method} {response.url} - {response.http_version} "
+        f"{response.status_code} - encoding: {response.headers.get('content-encoding', 'identity')} - "
+        f"rede: {bytes_rede} bytes, decodificado: {bytes_decodificados} bytes "
+        f"({economia:.1f}% de economia)"
+    )
+
+
+def post(url: str, data: Optional[Dict] = None, headers: Optional[Dict] = None) -> httpx.Response:
+    """
+    Envia um POST pelo cliente compartilhado e registra o tráfego da resposta.
+
+    Os cabeçalhos informados são combinados com os do cliente; se incluírem
+    Accept-Encoding, o valor informado prevalece.
+    """
+    response = obter_cliente().post(url, data=data, headers=headers)
+    _registrar_trafego(response)
+    return response
+
+
+def estatisticas() -> Dict[str, int]:
+    """Retorna uma cópia dos totais de tráfego acumulados no processo"""
+    with _lock:
+        return dict(_estatisticas)
+
+
+def fechar() -> None:
+    """Fecha o cliente compartilhado e registra o total de tráfego do processo"""
+    global _cliente
+
+    with _lock:
+        if _cliente is not None:
+            _cliente.close()
+            _cliente = None
+        totais = dict(_estatisticas)
+
+    if totais["requisicoes"]:
+        economia = (
+            (1 - totais["bytes_rede"] / totais["bytes_decodificados"]) * 100
+            if totais["bytes_decodificados"] else 0
+        )
+        logging.info(
+            f"Tráfego total: {totais['requisicoes']} requisições, "
+            f"rede: {totais['bytes_rede']} bytes, decodificado: {totais['bytes_decodificados']} bytes "
+            f"({economia:.1f}% de economia)"
+        )
+
+
+atexit.register(fechar)
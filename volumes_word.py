@@ -0,0 +1,88 @@
+"""
+Divisão do relatório Word em volumes gerados em paralelo.
+
+Em leilões com milhares de lotes um único documento com a tabela completa é
+lento para gerar e difícil de abrir. Este módulo divide os lotes em volumes de
+N lotes, gera cada volume em um processo separado (todos com o mesmo cabeçalho
+e o mesmo horário de geração no rodapé) e, opcionalmente, agrupa os arquivos
+em um .zip.
+
+Os lotes podem vir de qualquer iterável com ``len`` (por exemplo, um
+ordenacao_externa.OrdenadorExterno): os volumes são montados à medida que os
+lotes são lidos e só alguns ficam em memória ao mesmo tempo.
+"""
+
+import itertools
+import logging
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+def dividir_em_volumes(lotes: Iterable, lotes_por_volume: int) -> Iterator[List]:
+    """Divide os lotes em volumes de até ``lotes_por_volume`` lotes, sob demanda"""
+    if lotes_por_volume <= 0:
+        raise ValueError("A quantidade de lotes por volume deve ser maior que zero")
+    lotes = iter(lotes)
+    while True:
+        volume = list(itertools.islice(lotes, lotes_por_volume))
+        if not volume:
+            return
+        yield volume
+
+
+def gerar_volumes(gerar_documento: Callable, lotes: Iterable, nm_leilao: str,
+                  prefixo: str, lotes_por_volume: int,
+                  processos: Optional[int] = None,
+                  compactar: bool = False) -> List[str]:
+    """
+    Gera o relatório Word em volumes.
+
+    Args:
+        gerar_documento (Callable): Função do script que gera um documento,
+            com assinatura (lotes, nm_leilao, output_file, gerado_em)
+        lotes (Iterable): Lotes já ordenados; precisa suportar ``len``
+        nm_leilao (str): Nome do leilão usado no cabeçalho
+        prefixo (str): Prefixo dos arquivos, por exemplo 'relatorio_leilao_15324'
+        lotes_por_volume (int): Quantidade máxima de lotes por volume
+        processos (int): Quantidade de processos; padrão é o número de CPUs.
+            No máximo o dobro de volumes fica pendente em memória
+        compactar (bool): Agrupa os volumes em '<prefixo>.zip' e remove os .docx
+
+    Returns:
+        List[str]: Arquivos gerados (os volumes, ou apenas o .zip)
+    """
+    volumes = dividir_em_volumes(lotes, lotes_por_volume)
+    total = -(-len(lotes) // lotes_por_volume)
+    gerado_em = datetime.now()
+    arquivos = [
+        f'{prefixo}_vol{numero:03d}_de_{total:03d}.docx'
+        for numero in range(1, total + 1)
+    ]
+
+    logging.info(f'Gerando {total} volumes de até {lotes_por_volume} lotes')
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pendentes = deque()
+        limite_pendentes = 2 * (processos or os.cpu_count() or 1)
+        for volume, arquivo in zip(volumes, arquivos):
+            if len(pendentes) >= limite_pendentes:
+                pendentes.popleft().result()
+            pendentes.append(executor.submit(gerar_documento, volume, nm_leilao, arquivo, gerado_em))
+        for futuro in pendentes:
+            futuro.result()
+
+    if not compactar:
+        return arquivos
+
+    arquivo_zip = f'{prefixo}.zip'
+    # Os .docx já são compactados; armazenar sem nova compressão é mais rápido
+    with zipfile.ZipFile(arquivo_zip, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for arquivo in arquivos:
+            zf.write(arquivo, arcname=os.path.basename(arquivo))
+    for arquivo in arquivos:
+        os.remove(arquivo)
+
+    return [arquivo_zip]